@@ -1,20 +1,64 @@
-import json
+import sys
 from datetime import datetime, timezone as dt_timezone
+from functools import lru_cache
+from math import ceil
 
 from dateutil import parser as date_parser
-from django.utils import timezone
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Min, Q
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import exception_handler
 
 from panelsh_app.models import Asset
 
+# orjson ships no wheels for armv6l (Pi 1/Zero), where building it would
+# need a Rust toolchain; fall back to the stdlib decoder there.
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+
+# ``datetime.fromisoformat`` only understands the "Z" suffix from 3.11 on.
+_FROMISOFORMAT_ACCEPTS_Z = sys.version_info >= (3, 11)
+
+_UTC = dt_timezone.utc
+
+ACTIVE_ASSET_IDS_CACHE_KEY = 'panelsh:active_asset_ids'
+
+# Upper bound on how long the active asset IDs are cached. Model signals
+# invalidate the entry on writes; the cap bounds staleness for changes made
+# outside the ORM (e.g. directly in the database).
+ACTIVE_ASSET_IDS_MAX_TIMEOUT = 60
+
+_SQLITE_MAGIC = b'SQLite format 3\x00'
+
 
 class AssetCreationError(Exception):
+    __slots__ = ('errors',)
+
     def __init__(self, errors):
         self.errors = errors
 
 
+def _parse_iso_datetime(value):
+    """Parse an ISO 8601 string, preferring the C-implemented stdlib parser.
+
+    ``dateutil`` is only consulted for inputs ``fromisoformat`` rejects, so
+    that exotic but valid ISO 8601 variants keep working.
+    """
+    iso_value = value
+    if not _FROMISOFORMAT_ACCEPTS_Z and value.endswith(('Z', 'z')):
+        iso_value = value[:-1] + '+00:00'
+
+    try:
+        return datetime.fromisoformat(iso_value)
+    except ValueError:
+        return date_parser.isoparse(value)
+
+
 def parse_timezone_aware_datetime(value):
     """Return a timezone-aware datetime in UTC.
 
@@ -26,9 +70,13 @@ def parse_timezone_aware_datetime(value):
     if value in [None, ""]:
         return value
 
+    # Already-normalized values (e.g. from DRF's DateTimeField) need no work.
+    if type(value) is datetime and value.tzinfo is _UTC:
+        return value
+
     if isinstance(value, str):
         try:
-            parsed_value = date_parser.isoparse(value)
+            parsed_value = _parse_iso_datetime(value)
         except (ValueError, TypeError) as exc:
             raise ValueError(f"Invalid datetime value: {value}") from exc
     elif isinstance(value, datetime):
@@ -38,41 +86,89 @@ def parse_timezone_aware_datetime(value):
             "Datetime values must be ISO-formatted strings or datetime instances."
         )
 
-    if timezone.is_naive(parsed_value):
-        parsed_value = timezone.make_aware(parsed_value, dt_timezone.utc)
+    if (
+        parsed_value.tzinfo is None
+        or parsed_value.tzinfo.utcoffset(parsed_value) is None
+    ):
+        return parsed_value.replace(tzinfo=_UTC)
+
+    if parsed_value.tzinfo is _UTC:
+        return parsed_value
+
+    return parsed_value.astimezone(_UTC)
+
+
+_SKIP_FIELDS = frozenset({'asset_id', 'is_processing', 'mimetype', 'uri'})
+_INT_FIELDS = frozenset({
+    'play_order',
+    'skip_asset_check',
+    'is_enabled',
+    'is_active',
+    'nocache',
+    'duration',
+})
+_DATETIME_FIELDS = frozenset({'start_date', 'end_date'})
+
+_FIELD_CONVERTERS = {
+    **dict.fromkeys(_INT_FIELDS, int),
+    **dict.fromkeys(_DATETIME_FIELDS, parse_timezone_aware_datetime),
+}
+
+
+def _apply_asset_update(asset, data, converters):
+    # Only fields the asset already has are updatable; the set operations
+    # run in C instead of testing each payload key in Python.
+    for key in (data.keys() & asset.keys()) - _SKIP_FIELDS:
+        value = data[key]
+
+        # Asset mimetypes are bare kinds ("video", "image", ...), not full
+        # MIME types, so a prefix check is enough.
+        if key == 'duration' and not (
+            asset.get('mimetype') or ''
+        ).startswith('video'):
+            continue
 
-    return parsed_value.astimezone(dt_timezone.utc)
+        convert = converters.get(key)
+        if convert is not None:
+            value = convert(value)
 
+        asset[key] = value
 
-def update_asset(asset, data):
-    for key, value in list(data.items()):
 
-        if (
-            key in ['asset_id', 'is_processing', 'mimetype', 'uri']
-            or key not in asset
-        ):
-            continue
+def _memoized_datetime_parser():
+    cached_parse = lru_cache(maxsize=256)(parse_timezone_aware_datetime)
+
+    def parse(value):
+        # Only strings repeat across payloads; other values (including
+        # unhashable ones) go straight to the parser and its errors.
+        if isinstance(value, str):
+            return cached_parse(value)
+        return parse_timezone_aware_datetime(value)
+
+    return parse
+
 
-        if key in ['start_date', 'end_date']:
-            value = parse_timezone_aware_datetime(value)
+def update_assets(pairs):
+    """Apply each ``(asset, data)`` payload in ``pairs`` to its asset.
 
-        if (
-            key in [
-                'play_order',
-                'skip_asset_check',
-                'is_enabled',
-                'is_active',
-                'nocache',
-            ]
-        ):
-            value = int(value)
+    For more than one payload, datetime strings are parsed once per call,
+    so bulk payloads that share the same schedule reuse the parsed value.
+    """
+    pairs = tuple(pairs)
+    converters = _FIELD_CONVERTERS
+
+    if len(pairs) > 1:
+        converters = {
+            **_FIELD_CONVERTERS,
+            **dict.fromkeys(_DATETIME_FIELDS, _memoized_datetime_parser()),
+        }
 
-        if key == 'duration':
-            if "video" not in asset['mimetype']:
-                continue
-            value = int(value)
+    for asset, data in pairs:
+        _apply_asset_update(asset, data, converters)
 
-        asset.update({key: value})
+
+def update_asset(asset, data):
+    _apply_asset_update(asset, data, _FIELD_CONVERTERS)
 
 
 def custom_exception_handler(exc, context):
@@ -81,48 +177,156 @@ def custom_exception_handler(exc, context):
     if response is not None:
         return response
 
+    # Exceptions are almost always raised with a single message argument;
+    # use it as-is rather than going through str(exc). Anything else, such
+    # as non-string arguments or a custom __str__, is formatted as usual.
+    if len(exc.args) == 1 and isinstance(exc.args[0], str) and (
+        type(exc).__str__ is BaseException.__str__
+    ):
+        message = exc.args[0]
+    else:
+        message = str(exc) or exc.__class__.__name__
+
     return Response(
-        {"error": str(exc)},
+        {"error": message},
         status=status.HTTP_500_INTERNAL_SERVER_ERROR,
     )
 
 
+def _query_active_asset_ids(current_time):
+    # Mirrors ``Asset.is_active()``; comparisons against NULL dates never
+    # match, so disabled or unscheduled assets are excluded by the database.
+    return list(
+        Asset.objects.filter(
+            is_enabled=True,
+            start_date__lt=current_time,
+            end_date__gt=current_time,
+        ).values_list('asset_id', flat=True)
+    )
+
+
+def _active_asset_ids_timeout(current_time):
+    """Seconds until the next asset starts or ends, capped."""
+    boundaries = Asset.objects.filter(is_enabled=True).aggregate(
+        next_start=Min('start_date', filter=Q(start_date__gt=current_time)),
+        next_end=Min('end_date', filter=Q(end_date__gt=current_time)),
+    )
+    upcoming = [value for value in boundaries.values() if value is not None]
+
+    if not upcoming:
+        return ACTIVE_ASSET_IDS_MAX_TIMEOUT
+
+    seconds = (min(upcoming) - current_time).total_seconds()
+    return max(1, min(ACTIVE_ASSET_IDS_MAX_TIMEOUT, ceil(seconds)))
+
+
+def invalidate_active_asset_ids():
+    cache.delete(ACTIVE_ASSET_IDS_CACHE_KEY)
+
+
 def get_active_asset_ids():
-    enabled_assets = Asset.objects.filter(
-        is_enabled=1,
-        start_date__isnull=False,
-        end_date__isnull=False,
+    active_asset_ids = cache.get(ACTIVE_ASSET_IDS_CACHE_KEY)
+    if active_asset_ids is not None:
+        return active_asset_ids
+
+    current_time = datetime.now(_UTC)
+    active_asset_ids = _query_active_asset_ids(current_time)
+    cache.set(
+        ACTIVE_ASSET_IDS_CACHE_KEY,
+        active_asset_ids,
+        _active_asset_ids_timeout(current_time),
     )
-    return [
-        asset.asset_id
-        for asset in enabled_assets
-        if asset.is_active()
-    ]
+    return active_asset_ids
+
+
+def get_database_version():
+    """Return SQLite's file change counter for the default database.
+
+    SQLite increments this header field on every committed write, whichever
+    process makes it, so it changes whenever any table may have changed.
+    Returns ``None`` when no such counter is available: for other database
+    backends, in-memory databases (as used by tests) and WAL mode, where
+    commits don't update the header.
+    """
+    if connection.vendor != 'sqlite':
+        return None
+
+    try:
+        with open(connection.settings_dict['NAME'], 'rb') as db_file:
+            header = db_file.read(28)
+    except (OSError, TypeError, ValueError):
+        return None
+
+    # Bytes 18-19 are 1 for rollback-journal and 2 for WAL databases.
+    if len(header) < 28 or not header.startswith(_SQLITE_MAGIC):
+        return None
+    if header[18] != 1:
+        return None
+
+    return int.from_bytes(header[24:28], 'big')
 
 
 def save_active_assets_ordering(active_asset_ids):
-    for i, asset_id in enumerate(active_asset_ids):
-        Asset.objects.filter(asset_id=asset_id).update(play_order=i)
+    # A dict keeps the last position of a repeated ID, as the former
+    # row-by-row UPDATE loop did.
+    play_orders = {
+        asset_id: i for i, asset_id in enumerate(active_asset_ids)
+    }
+
+    if not play_orders:
+        return
+
+    # One ``UPDATE ... SET play_order = CASE asset_id WHEN ...`` statement
+    # (batched by Django to the backend's parameter limit) instead of one
+    # query per asset.
+    Asset.objects.bulk_update(
+        [
+            Asset(asset_id=asset_id, play_order=play_order)
+            for asset_id, play_order in play_orders.items()
+        ],
+        ['play_order'],
+    )
+
+    # bulk_update() sends no post_save signals, so drop the cached active
+    # asset IDs here, as the receivers in api.signals do for saves.
+    invalidate_active_asset_ids()
+    transaction.on_commit(invalidate_active_asset_ids)
+
+
+_JSON_DOCUMENT_TYPES = (str, bytes, bytearray)
 
 
 def parse_request(request):
     # For backward compatibility
     raw_data = request.data
 
-    try:
-        return json.loads(raw_data)
-    except (TypeError, ValueError):
-        pass
-
-    if not isinstance(raw_data, dict):
-        raise ValueError(
-            "Request data is not valid JSON and does not include a 'model' field."
-        )
-
-    if 'model' not in raw_data:
-        raise ValueError("Request data is missing the required 'model' field.")
+    # JSON and form bodies arrive already decoded by DRF; only the legacy
+    # ``model`` field still needs decoding. Anything that is not a mapping
+    # or a JSON document is rejected without attempting a decode.
+    if isinstance(raw_data, dict):
+        if 'model' not in raw_data:
+            raise ValueError(
+                "Request data is missing the required 'model' field."
+            )
+
+        model = raw_data['model']
+        if isinstance(model, _JSON_DOCUMENT_TYPES):
+            try:
+                return json_loads(model)
+            except ValueError as exc:
+                raise ValueError(
+                    "Request 'model' field is not valid JSON."
+                ) from exc
+
+        raise ValueError("Request 'model' field is not valid JSON.")
+
+    if isinstance(raw_data, _JSON_DOCUMENT_TYPES):
+        try:
+            return json_loads(raw_data)
+        except ValueError:
+            pass
 
-    try:
-        return json.loads(raw_data['model'])
-    except (TypeError, ValueError) as exc:
-        raise ValueError("Request 'model' field is not valid JSON.") from exc
+    raise ValueError(
+        "Request data is not valid JSON and does not include a 'model' "
+        "field."
+    )
@@ -0,0 +1,24 @@
+from django.middleware.gzip import GZipMiddleware
+
+
+class APIGZipMiddleware(GZipMiddleware):
+    """Gzip API responses of at least ``min_length`` bytes.
+
+    Only ``/api/`` is compressed: HTML pages embed the CSRF token, and
+    compressing them would expose it to BREACH-style attacks. Views compute
+    ETags on the uncompressed body, so validators match across encodings.
+    """
+
+    min_length = 500
+
+    def process_response(self, request, response):
+        if not request.path.startswith('/api/'):
+            return response
+
+        if (
+            not response.streaming
+            and len(response.content) < self.min_length
+        ):
+            return response
+
+        return super().process_response(request, response)
@@ -0,0 +1,38 @@
+from rest_framework.renderers import JSONRenderer
+
+# orjson ships no wheels for armv6l (Pi 1/Zero), where building it would
+# need a Rust toolchain; the stdlib-based DRF renderer is used there.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class ORJSONRenderer(JSONRenderer):
+    """JSONRenderer that encodes with orjson when it is available.
+
+    Indented output (e.g. for the browsable API) is left to the stdlib
+    encoder. Datetimes and any other types orjson does not handle natively
+    go through DRF's encoder, so the output matches ``JSONRenderer``.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or self.get_indent(
+            accepted_media_type, renderer_context or {}
+        ):
+            return super().render(
+                data, accepted_media_type, renderer_context)
+
+        if data is None:
+            return b''
+
+        body = orjson.dumps(
+            data,
+            default=self.encoder_class().default,
+            option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+        )
+
+        # DRF escapes the line and paragraph separators, which are valid in
+        # JSON but end JavaScript string literals; orjson leaves them as is.
+        return body.replace(b'\xe2\x80\xa8', b'\\u2028').replace(
+            b'\xe2\x80\xa9', b'\\u2029')
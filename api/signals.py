@@ -0,0 +1,15 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from api.helpers import invalidate_active_asset_ids
+from panelsh_app.models import Asset
+
+
+@receiver(post_save, sender=Asset)
+@receiver(post_delete, sender=Asset)
+def on_asset_changed(sender, **kwargs):
+    invalidate_active_asset_ids()
+    # A request may repopulate the cache from the last committed state
+    # before an enclosing transaction commits; drop that entry as well.
+    transaction.on_commit(invalidate_active_asset_ids)
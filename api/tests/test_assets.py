@@ -1,19 +1,27 @@
 """
 Tests for asset-related API endpoints.
 """
+import json
+from datetime import timedelta
+
 import mock
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 from django.urls import reverse
+from django.utils import timezone
+from redis.exceptions import ConnectionError as RedisConnectionError
 from rest_framework import status
 from rest_framework.test import APIClient
 from unittest_parametrize import ParametrizedTestCase, parametrize
 
+from api.helpers import ACTIVE_ASSET_IDS_CACHE_KEY, get_active_asset_ids
 from api.tests.test_common import (
     ASSET_CREATION_DATA,
     ASSET_UPDATE_DATA_V1_2,
     ASSET_UPDATE_DATA_V2,
     get_request_data,
 )
+from panelsh_app.models import Asset
 
 parametrize_version = parametrize(
     'version',
@@ -169,3 +177,343 @@ class CRUDAssetEndpointsTest(TestCase, ParametrizedTestCase):
 
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         self.assertEqual(len(assets), 0)
+
+
+class AssetListViewV2Test(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse('api:asset_list_v2')
+        now = timezone.now()
+        Asset.objects.create(
+            asset_id='asset-1',
+            name='Asset',
+            uri='https://panelsh.io',
+            mimetype='webpage',
+            start_date=now - timedelta(days=1),
+            end_date=now + timedelta(days=1),
+        )
+
+    def test_list_returns_etag_and_json_body(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertTrue(response['ETag'].startswith('W/"'))
+        self.assertEqual(response.json()[0]['asset_id'], 'asset-1')
+        self.assertEqual(response.data[0]['asset_id'], 'asset-1')
+
+    def test_matching_if_none_match_returns_304(self):
+        etag = self.client.get(self.url)['ETag']
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_etag_in_if_none_match_list_returns_304(self):
+        etag = self.client.get(self.url)['ETag']
+
+        response = self.client.get(
+            self.url, HTTP_IF_NONE_MATCH=f'W/"other", {etag} ')
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_etag_changes_when_assets_change(self):
+        etag = self.client.get(self.url)['ETag']
+        Asset.objects.filter(asset_id='asset-1').update(name='Renamed')
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    @mock.patch('api.views.v2.get_active_asset_ids', return_value=['asset-1'])
+    @mock.patch('api.views.v2.get_database_version', return_value=7)
+    def test_database_version_answers_304_without_queries(self, *mocks):
+        etag = self.client.get(self.url)['ETag']
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+
+    @mock.patch('api.views.v2.diagnostics.get_git_hash')
+    @mock.patch('api.views.v2.get_active_asset_ids', return_value=['asset-1'])
+    @mock.patch('api.views.v2.get_database_version', return_value=7)
+    def test_upgrade_changes_database_version_etag(
+        self, _, __, get_git_hash_mock
+    ):
+        get_git_hash_mock.return_value = 'abc123'
+        etag = self.client.get(self.url)['ETag']
+
+        get_git_hash_mock.return_value = 'def456'
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_is_active_filter(self):
+        now = timezone.now()
+        Asset.objects.filter(asset_id='asset-1').update(is_enabled=True)
+        Asset.objects.create(
+            asset_id='expired',
+            is_enabled=True,
+            start_date=now - timedelta(days=2),
+            end_date=now - timedelta(days=1),
+        )
+        Asset.objects.create(
+            asset_id='disabled',
+            is_enabled=False,
+            start_date=now - timedelta(days=1),
+            end_date=now + timedelta(days=1),
+        )
+        Asset.objects.create(asset_id='unscheduled')
+
+        active = self.client.get(self.url, {'is_active': 'true'}).json()
+        inactive = self.client.get(self.url, {'is_active': 'false'}).json()
+
+        self.assertEqual([a['asset_id'] for a in active], ['asset-1'])
+        self.assertCountEqual(
+            [a['asset_id'] for a in inactive],
+            ['expired', 'disabled', 'unscheduled'],
+        )
+
+    def test_search_ignores_surrounding_whitespace(self):
+        Asset.objects.create(asset_id='asset-2', name='Other')
+
+        response = self.client.get(self.url, {'search': '  panelsh '})
+        self.assertEqual(
+            [a['asset_id'] for a in response.json()], ['asset-1'])
+
+        response = self.client.get(self.url, {'search': '   '})
+        self.assertEqual(len(response.json()), 2)
+
+    def test_create_returns_reordered_play_order(self):
+        Asset.objects.filter(asset_id='asset-1').update(is_enabled=True)
+        now = timezone.now()
+
+        response = self.client.post(self.url, data={
+            'name': 'New',
+            'uri': 'https://example.com',
+            'mimetype': 'webpage',
+            'start_date': (now - timedelta(days=1)).isoformat(),
+            'end_date': (now + timedelta(days=1)).isoformat(),
+            'duration': 10,
+            'is_enabled': True,
+            'nocache': False,
+            'play_order': 5,
+            'skip_asset_check': True,
+        }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['play_order'], 1)
+        self.assertEqual(
+            Asset.objects.get(asset_id=response.data['asset_id']).play_order,
+            1,
+        )
+
+    def test_pagination_without_exact_count_reports_has_more(self):
+        Asset.objects.create(asset_id='asset-2', name='Second')
+
+        response = self.client.get(
+            self.url, {'page': 1, 'page_size': 1, 'exact_count': 'false'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('count', response.data)
+        self.assertTrue(response.data['has_more'])
+        self.assertEqual(len(response.data['results']), 1)
+
+        response = self.client.get(
+            self.url, {'page': 2, 'page_size': 1, 'exact_count': 'false'})
+
+        self.assertFalse(response.data['has_more'])
+        self.assertEqual(len(response.data['results']), 1)
+
+    def test_stream_returns_the_same_assets(self):
+        Asset.objects.create(asset_id='asset-2', name='Second', play_order=1)
+        expected = self.client.get(self.url).json()
+
+        response = self.client.get(self.url, {'stream': '1'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(
+            json.loads(b''.join(response.streaming_content)), expected)
+
+    @mock.patch('api.views.v2.get_active_asset_ids', return_value=['asset-1'])
+    @mock.patch('api.views.v2.get_database_version', return_value=7)
+    def test_stream_skips_conditional_requests(self, *mocks):
+        etag = self.client.get(self.url)['ETag']
+
+        response = self.client.get(
+            self.url, {'stream': '1'}, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertNotIn('ETag', response)
+
+    def test_stream_is_ignored_for_other_renderers(self):
+        response = self.client.get(
+            self.url, {'stream': '1', 'format': 'api'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.streaming)
+        self.assertTrue(response['Content-Type'].startswith('text/html'))
+
+
+@override_settings(CACHES={
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+})
+@mock.patch('api.views.v2.get_database_version', return_value=7)
+class AssetListBodyCacheTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse('api:asset_list_v2')
+        Asset.objects.create(asset_id='asset-1', name='Asset')
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_unchanged_list_is_served_from_cache(self, _):
+        first = self.client.get(self.url)
+
+        with self.assertNumQueries(0):
+            second = self.client.get(self.url)
+
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['ETag'], first['ETag'])
+        self.assertEqual(second['Content-Type'], 'application/json')
+
+    def test_new_database_version_skips_cached_body(
+        self, get_database_version_mock
+    ):
+        self.client.get(self.url)
+        Asset.objects.filter(asset_id='asset-1').update(name='Renamed')
+        get_database_version_mock.return_value = 8
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.json()[0]['name'], 'Renamed')
+
+    @mock.patch('api.views.v2.cache')
+    def test_cache_errors_fall_back_to_rendering(self, cache_mock, _):
+        cache_mock.get.side_effect = RedisConnectionError
+        cache_mock.set.side_effect = RedisConnectionError
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()[0]['asset_id'], 'asset-1')
+
+        cache_mock.get.side_effect = None
+        cache_mock.get.return_value = None
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        cache_mock.set.assert_called_once()
+
+
+class AssetViewV2Test(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        now = timezone.now()
+        Asset.objects.create(
+            asset_id='asset-1',
+            name='Asset',
+            uri='https://panelsh.io',
+            md5='abc123',
+            mimetype='webpage',
+            start_date=now - timedelta(days=1),
+            end_date=now + timedelta(days=1),
+        )
+        self.url = reverse('api:asset_detail_v2', args=['asset-1'])
+
+    def test_update_returns_saved_values_and_keeps_md5(self):
+        response = self.client.put(
+            self.url, data=ASSET_UPDATE_DATA_V2, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['name'], 'Panelsh')
+        self.assertEqual(response.data['duration'], 15)
+        self.assertTrue(response.data['is_enabled'])
+
+        asset = Asset.objects.get(asset_id='asset-1')
+        self.assertEqual(asset.name, 'Panelsh')
+        self.assertEqual(asset.md5, 'abc123')
+        self.assertEqual(
+            response.data, self.client.get(self.url).data)
+
+    def test_missing_asset_returns_404(self):
+        url = reverse('api:asset_detail_v2', args=['missing'])
+
+        self.assertEqual(
+            self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(
+            self.client.patch(url, data={}, format='json').status_code,
+            status.HTTP_404_NOT_FOUND,
+        )
+
+
+@override_settings(CACHES={
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+})
+class ActiveAssetIdsCacheTest(TestCase):
+    def create_asset(self, asset_id, **kwargs):
+        now = timezone.now()
+        return Asset.objects.create(
+            asset_id=asset_id,
+            is_enabled=True,
+            start_date=now - timedelta(days=1),
+            end_date=now + timedelta(days=1),
+            **kwargs,
+        )
+
+    def test_result_is_cached(self):
+        self.create_asset('asset-1')
+
+        self.assertEqual(get_active_asset_ids(), ['asset-1'])
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_active_asset_ids(), ['asset-1'])
+
+    def test_cache_is_invalidated_on_save_and_delete(self):
+        asset = self.create_asset('asset-1')
+        self.assertEqual(get_active_asset_ids(), ['asset-1'])
+
+        asset.is_enabled = False
+        asset.save()
+        self.assertEqual(get_active_asset_ids(), [])
+
+        asset.is_enabled = True
+        asset.save()
+        self.assertEqual(get_active_asset_ids(), ['asset-1'])
+
+        asset.delete()
+        self.assertEqual(get_active_asset_ids(), [])
+
+    def test_cache_is_invalidated_on_reorder(self):
+        self.addCleanup(cache.clear)
+        for asset_id in ('asset-1', 'asset-2'):
+            self.create_asset(asset_id)
+        get_active_asset_ids()
+
+        response = APIClient().post(
+            reverse('api:playlist_order_v2'),
+            data={'ids': 'asset-2,asset-1'},
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertIsNone(cache.get(ACTIVE_ASSET_IDS_CACHE_KEY))
+
+        assets = APIClient().get(reverse('api:asset_list_v2')).json()
+        self.assertEqual(
+            {asset['asset_id']: asset['play_order'] for asset in assets},
+            {'asset-1': 1, 'asset-2': 0},
+        )
@@ -26,7 +26,12 @@ if not django_settings.configured:
     )
     django.setup()
 
-from api.helpers import parse_timezone_aware_datetime
+from api.helpers import (
+    custom_exception_handler,
+    parse_timezone_aware_datetime,
+    update_asset,
+    update_assets,
+)
 
 
 def test_parse_timezone_aware_datetime_from_string_normalizes_to_utc():
@@ -39,6 +44,14 @@ def test_parse_timezone_aware_datetime_from_string_normalizes_to_utc():
     assert parsed.tzinfo == dt_timezone.utc
 
 
+def test_parse_timezone_aware_datetime_fixed_width_utc_string():
+    parsed = parse_timezone_aware_datetime("2019-08-24T14:15:22Z")
+
+    assert parsed == datetime(2019, 8, 24, 14, 15, 22, tzinfo=dt_timezone.utc)
+    # The C parser hands back the UTC singleton, so no conversion is needed.
+    assert parsed.tzinfo is dt_timezone.utc
+
+
 def test_parse_timezone_aware_datetime_from_naive_datetime():
     naive = datetime(2019, 8, 24, 14, 15, 22)
 
@@ -48,6 +61,109 @@ def test_parse_timezone_aware_datetime_from_naive_datetime():
     assert parsed.utcoffset() == timedelta(0)
 
 
+def test_parse_timezone_aware_datetime_converts_offsets_to_utc():
+    parsed = parse_timezone_aware_datetime("2019-08-24T16:15:22+02:00")
+
+    assert parsed == datetime(2019, 8, 24, 14, 15, 22, tzinfo=dt_timezone.utc)
+    assert parsed.tzinfo is dt_timezone.utc
+
+
+def test_parse_timezone_aware_datetime_returns_utc_datetime_unchanged():
+    value = datetime(2019, 8, 24, 14, 15, 22, tzinfo=dt_timezone.utc)
+
+    assert parse_timezone_aware_datetime(value) is value
+
+
 def test_parse_timezone_aware_datetime_rejects_invalid_type():
     with pytest.raises(TypeError):
         parse_timezone_aware_datetime(123)
+
+
+def test_update_asset_converts_and_skips_fields():
+    asset = {
+        'asset_id': 'abc',
+        'mimetype': 'image',
+        'duration': 10,
+        'play_order': 0,
+        'start_date': None,
+        'name': 'old',
+    }
+
+    update_asset(asset, {
+        'asset_id': 'other',
+        'duration': '20',
+        'play_order': '3',
+        'start_date': '2019-08-24T14:15:22Z',
+        'name': 'new',
+        'unknown': 'ignored',
+    })
+
+    assert asset['asset_id'] == 'abc'
+    assert asset['duration'] == 10
+    assert asset['play_order'] == 3
+    assert asset['start_date'] == datetime(
+        2019, 8, 24, 14, 15, 22, tzinfo=dt_timezone.utc
+    )
+    assert asset['name'] == 'new'
+    assert 'unknown' not in asset
+
+
+def test_update_asset_sets_duration_for_videos():
+    asset = {'mimetype': 'video', 'duration': 10}
+
+    update_asset(asset, {'duration': '42'})
+
+    assert asset['duration'] == 42
+
+
+def test_update_assets_applies_each_payload():
+    first = {'mimetype': 'image', 'start_date': None, 'name': 'a'}
+    second = {'mimetype': 'video', 'start_date': None, 'duration': 5}
+
+    update_assets([
+        (first, {'start_date': '2019-08-24T14:15:22Z', 'name': 'b'}),
+        (second, {'start_date': '2019-08-24T14:15:22Z', 'duration': '7'}),
+    ])
+
+    expected = datetime(2019, 8, 24, 14, 15, 22, tzinfo=dt_timezone.utc)
+    assert first == {'mimetype': 'image', 'start_date': expected, 'name': 'b'}
+    assert second == {
+        'mimetype': 'video',
+        'start_date': expected,
+        'duration': 7,
+    }
+
+
+def test_update_assets_rejects_unhashable_dates_with_parse_error():
+    with pytest.raises(TypeError, match='Datetime values must be'):
+        update_assets([
+            ({'start_date': None}, {'start_date': '2019-08-24T14:15:22Z'}),
+            ({'start_date': None}, {'start_date': ['2019-08-24']}),
+        ])
+
+
+def test_custom_exception_handler_uses_exception_message():
+    response = custom_exception_handler(ValueError('boom'), {})
+
+    assert response.status_code == 500
+    assert response.data == {'error': 'boom'}
+
+
+def test_custom_exception_handler_formats_other_exceptions():
+    class CustomError(Exception):
+        def __str__(self):
+            return 'custom message'
+
+    assert custom_exception_handler(
+        KeyError('missing'), {}).data == {'error': "'missing'"}
+    assert custom_exception_handler(
+        OSError(2, 'No such file'), {}
+    ).data == {'error': '[Errno 2] No such file'}
+    assert custom_exception_handler(
+        CustomError('ignored'), {}).data == {'error': 'custom message'}
+
+
+def test_custom_exception_handler_falls_back_to_class_name():
+    response = custom_exception_handler(RuntimeError(), {})
+
+    assert response.data == {'error': 'RuntimeError'}
@@ -33,7 +33,7 @@ class InfoEndpointsTest(TestCase):
         'lib.diagnostics.get_load_avg',
         return_value={'15 min': 0.11}
     )
-    @mock.patch('api.views.mixins.size', return_value='15G')
+    @mock.patch('api.views.mixins.format_file_size', return_value='15G')
     @mock.patch('api.views.mixins.statvfs', mock.MagicMock())
     @mock.patch('api.views.mixins.r.get', return_value='off')
     def test_info_v1_endpoint(
@@ -83,9 +83,14 @@ class InfoEndpointsTest(TestCase):
         'lib.diagnostics.get_load_avg',
         return_value={'15 min': 0.25}
     )
-    @mock.patch('api.views.v2.size', return_value='20G')
-    @mock.patch('api.views.v2.statvfs', mock.MagicMock())
-    @mock.patch('api.views.v2.r.get', return_value='on')
+    @mock.patch('api.views.v2.format_file_size', return_value='20G')
+    @mock.patch('api.views.v2.diagnostics.get_disk_usage', mock.MagicMock())
+    @mock.patch(
+        'api.views.v2.r.pipeline',
+        return_value=mock.MagicMock(
+            execute=mock.MagicMock(return_value=['on', {}])
+        )
+    )
     @mock.patch(
         'api.views.v2.diagnostics.get_git_branch',
         return_value='main'
@@ -132,7 +137,7 @@ class InfoEndpointsTest(TestCase):
         get_uptime_mock,
         get_git_short_hash_mock,
         get_git_branch_mock,
-        redis_get_mock,
+        redis_pipeline_mock,
         size_mock,
         get_load_avg_mock,
         is_up_to_date_mock,
@@ -149,7 +154,7 @@ class InfoEndpointsTest(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
         self._assert_mock_calls([
-            redis_get_mock,
+            redis_pipeline_mock,
             size_mock,
             get_load_avg_mock,
             is_up_to_date_mock,
@@ -200,9 +205,14 @@ class InfoEndpointsTest(TestCase):
         'lib.diagnostics.get_load_avg',
         return_value={'15 min': 0.25}
     )
-    @mock.patch('api.views.v2.size', return_value='20G')
-    @mock.patch('api.views.v2.statvfs', mock.MagicMock())
-    @mock.patch('api.views.v2.r.get', return_value='on')
+    @mock.patch('api.views.v2.format_file_size', return_value='20G')
+    @mock.patch('api.views.v2.diagnostics.get_disk_usage', mock.MagicMock())
+    @mock.patch(
+        'api.views.v2.r.pipeline',
+        return_value=mock.MagicMock(
+            execute=mock.MagicMock(return_value=['on', {}])
+        )
+    )
     @mock.patch('api.views.v2.diagnostics.get_git_branch', return_value='main')
     @mock.patch(
         'api.views.v2.diagnostics.get_git_short_hash',
@@ -249,7 +259,7 @@ class InfoEndpointsTest(TestCase):
         parse_cpu_info_mock,
         get_git_short_hash_mock,
         get_git_branch_mock,
-        redis_get_mock,
+        redis_pipeline_mock,
         size_mock,
         get_load_avg_mock,
         is_up_to_date_mock
@@ -262,7 +272,7 @@ class InfoEndpointsTest(TestCase):
 
         # Assert mock calls
         self._assert_mock_calls([
-            redis_get_mock,
+            redis_pipeline_mock,
             size_mock,
             get_load_avg_mock,
             is_up_to_date_mock,
@@ -0,0 +1,20 @@
+from datetime import datetime, timezone
+
+from django.test import SimpleTestCase
+from rest_framework.renderers import JSONRenderer
+
+from api.renderers import ORJSONRenderer
+
+
+class ORJSONRendererTest(SimpleTestCase):
+    def test_output_matches_json_renderer(self):
+        data = {
+            'name': 'Line\u2028and paragraph\u2029separators, café',
+            'start_date': datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+            'play_order': 1,
+        }
+
+        self.assertEqual(
+            ORJSONRenderer().render(data),
+            JSONRenderer().render(data),
+        )
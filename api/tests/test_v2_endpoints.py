@@ -2,14 +2,18 @@
 Tests for V2 API endpoints.
 """
 import hashlib
+import threading
 from unittest import mock
 from unittest.mock import patch
 
 from django.test import TestCase
 from django.urls import reverse
+from redis.exceptions import ConnectionError as RedisConnectionError
 from rest_framework import status
 from rest_framework.test import APIClient
 
+from api.views.v2 import HEALTH_CHECK_TIMEOUT, get_disk_usage
+
 
 class DeviceSettingsViewV2Test(TestCase):
     def setUp(self):
@@ -141,9 +145,13 @@ class DeviceSettingsViewV2Test(TestCase):
 
         settings_mock.load.assert_called_once()
         settings_mock.save.assert_called_once()
-        self.assertEqual(
-            settings_mock.__setitem__.call_count, 5
-        )
+        settings_mock.__setitem__.assert_called_once_with('auth_backend', '')
+        settings_mock.update.assert_called_once_with({
+            'player_name': 'New Player',
+            'audio_output': 'hdmi',
+            'default_duration': 20,
+            'show_splash': True,
+        })
 
         publisher_instance.send_to_viewer.assert_called_once_with('reload')
 
@@ -403,22 +411,17 @@ class TestIntegrationsViewV2(TestCase):
         self.integrations_url = reverse('api:integrations_v2')
 
     @patch('api.views.v2.is_balena_app')
-    @patch('api.views.v2.getenv')
-    def test_integrations_balena_environment(
-        self,
-        mock_getenv,
-        mock_is_balena
-    ):
+    @patch.dict('api.views.v2._BALENA_ENV', {
+        'balena_device_id': 'test-device-uuid',
+        'balena_app_id': 'test-app-id',
+        'balena_app_name': 'test-app-name',
+        'balena_supervisor_version': 'test-supervisor-version',
+        'balena_host_os_version': 'test-host-os-version',
+        'balena_device_name_at_init': 'test-device-name',
+    })
+    def test_integrations_balena_environment(self, mock_is_balena):
         # Mock Balena environment
         mock_is_balena.side_effect = lambda: True
-        mock_getenv.side_effect = lambda x: {
-            'BALENA_DEVICE_UUID': 'test-device-uuid',
-            'BALENA_APP_ID': 'test-app-id',
-            'BALENA_APP_NAME': 'test-app-name',
-            'BALENA_SUPERVISOR_VERSION': 'test-supervisor-version',
-            'BALENA_HOST_OS_VERSION': 'test-host-os-version',
-            'BALENA_DEVICE_NAME_AT_INIT': 'test-device-name',
-        }.get(x)
 
         response = self.client.get(self.integrations_url)
         self.assertEqual(response.status_code, 200)
@@ -448,3 +451,74 @@ class TestIntegrationsViewV2(TestCase):
             'balena_host_os_version': None,
             'balena_device_name_at_init': None,
         })
+
+
+class HealthViewV2Test(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.health_url = reverse('api:health_v2')
+
+    @patch('api.views.v2.check_zmq_health', return_value={'status': 'ok'})
+    @patch('api.views.v2.check_redis_health', return_value={'status': 'ok'})
+    def test_health_ok(self, check_redis_mock, _):
+        response = self.client.get(self.health_url)
+
+        check_redis_mock.assert_called_once_with(
+            timeout=HEALTH_CHECK_TIMEOUT)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), {
+            'status': 'ok',
+            'services': {
+                'redis': {'status': 'ok'},
+                'zmq': {'status': 'ok'},
+            },
+        })
+
+    @patch('api.views.v2.HEALTH_CHECK_TIMEOUT', 0.05)
+    @patch('api.views.v2.check_zmq_health', return_value={'status': 'ok'})
+    @patch('api.views.v2.check_redis_health')
+    def test_hung_probe_reports_degraded(self, check_redis_mock, _):
+        released = threading.Event()
+        check_redis_mock.side_effect = lambda **kwargs: released.wait(5)
+
+        try:
+            response = self.client.get(self.health_url)
+        finally:
+            released.set()
+
+        self.assertEqual(response.json()['status'], 'degraded')
+        self.assertEqual(
+            response.json()['services']['redis']['status'], 'error')
+        self.assertEqual(
+            response.json()['services']['zmq'], {'status': 'ok'})
+
+
+class GetDiskUsageTest(TestCase):
+    @patch('api.views.v2.diagnostics.get_disk_usage')
+    @patch('api.views.v2.r')
+    def test_uses_cached_disk_usage(self, redis_mock, get_disk_usage_mock):
+        redis_mock.hgetall.return_value = {'total': '1000', 'free': '250'}
+
+        self.assertEqual(get_disk_usage(), {'total': 1000, 'free': 250})
+        get_disk_usage_mock.assert_not_called()
+
+    @patch(
+        'api.views.v2.diagnostics.get_disk_usage',
+        return_value={'total': 40960, 'free': 16384},
+    )
+    @patch('api.views.v2.r')
+    def test_measures_filesystem_when_not_cached(self, redis_mock, _):
+        redis_mock.hgetall.return_value = {}
+
+        self.assertEqual(get_disk_usage(), {'total': 40960, 'free': 16384})
+
+    @patch(
+        'api.views.v2.diagnostics.get_disk_usage',
+        return_value={'total': 40960, 'free': 16384},
+    )
+    @patch('api.views.v2.r')
+    def test_measures_filesystem_when_redis_fails(self, redis_mock, _):
+        redis_mock.hgetall.side_effect = RedisConnectionError()
+
+        self.assertEqual(get_disk_usage(), {'total': 40960, 'free': 16384})
@@ -5,7 +5,6 @@ from mimetypes import guess_extension, guess_type
 from os import path, remove, statvfs
 
 from drf_spectacular.utils import OpenApiParameter, OpenApiTypes, extend_schema
-from hurry.filesize import size
 from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
@@ -22,7 +21,7 @@ from celery_tasks import reboot_panelsh, shutdown_panelsh
 from lib import backup_helper, diagnostics
 from lib.auth import authorized
 from lib.github import is_up_to_date
-from lib.utils import connect_to_redis
+from lib.utils import connect_to_redis, format_file_size
 from settings import ZmqPublisher, settings
 
 r = connect_to_redis()
@@ -318,7 +317,7 @@ class InfoViewMixin(APIView):
 
         # Calculate disk space
         slash = statvfs("/")
-        free_space = size(slash.f_bavail * slash.f_frsize)
+        free_space = format_file_size(slash.f_bavail * slash.f_frsize)
         display_power = r.get('display_power')
 
         return Response({
@@ -1,19 +1,23 @@
 import hashlib
 import os
 import ipaddress
-import json
 import logging
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import timedelta
-from os import getenv, statvfs
+from os import getenv
 from platform import machine
 
 import psutil
 import requests
+from django.core.cache import cache
+from django.db import transaction
 from django.db.models import Q
-from django.utils import timezone
+from django.db.models.functions import Now
+from django.http import HttpResponse, StreamingHttpResponse
 from drf_spectacular.utils import extend_schema
-from hurry.filesize import size
+from redis.exceptions import RedisError
 from rest_framework import status
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
@@ -22,8 +26,10 @@ from panelsh_app.models import Asset
 from api.helpers import (
     AssetCreationError,
     get_active_asset_ids,
+    get_database_version,
     save_active_assets_ordering,
 )
+from api.renderers import ORJSONRenderer
 from api.serializers.v2 import (
     AssetSerializerV2,
     CreateAssetSerializerV2,
@@ -51,6 +57,7 @@ from lib.utils import (
     check_redis_health,
     check_zmq_health,
     connect_to_redis,
+    format_file_size,
     get_balena_device_info,
     get_balena_supervisor_status as fetch_balena_supervisor_status,
     get_node_ip,
@@ -63,6 +70,54 @@ r = connect_to_redis()
 logger = logging.getLogger(__name__)
 
 
+def get_disk_usage(cached=None):
+    """Return the total and free bytes of the root filesystem.
+
+    Uses the figures the ``update_disk_usage`` Celery task refreshes every
+    30 seconds, and only measures the filesystem when they are unavailable.
+    ``cached`` is the ``disk_usage`` hash, for callers that have already
+    fetched it from Redis.
+    """
+    if cached is None:
+        try:
+            cached = r.hgetall('disk_usage')
+        except RedisError:
+            cached = {}
+
+    if cached.keys() >= {'total', 'free'}:
+        return {
+            'total': int(cached['total']),
+            'free': int(cached['free']),
+        }
+
+    return diagnostics.get_disk_usage()
+
+
+# Model columns the list serializer reads; anything else (e.g. ``md5``) is
+# left out of the SELECT. ``is_active`` is computed from these columns.
+ASSET_LIST_FIELDS = tuple(
+    field.name
+    for field in Asset._meta.concrete_fields
+    if field.name in AssetSerializerV2.Meta.fields
+)
+
+# Rendered bodies of the unpaginated asset list are cached under their ETag,
+# which already identifies the app and database versions, filters and media
+# type.
+ASSET_LIST_CACHE_KEY_PREFIX = 'panelsh:asset_list:'
+ASSET_LIST_CACHE_TIMEOUT = 300
+ASSET_LIST_CACHE_MAX_SIZE = 1024 * 1024
+
+# Mirrors ``Asset.is_active()``. ``Now()`` lets the database supply the
+# current time, so the filter is built once rather than per request.
+ACTIVE_FILTER = Q(is_enabled=True, start_date__lt=Now(), end_date__gt=Now())
+
+_QUERY_PARAM_BOOLS = {
+    **dict.fromkeys(('1', 'true', 'yes', 'on'), True),
+    **dict.fromkeys(('0', 'false', 'no', 'off'), False),
+}
+
+
 class AssetListViewV2(APIView):
     serializer_class = AssetSerializerV2
 
@@ -71,20 +126,18 @@ class AssetListViewV2(APIView):
         if value is None:
             return None
 
-        normalized = value.strip().lower()
-
-        if normalized in {'1', 'true', 'yes', 'on'}:
-            return True
+        parsed = _QUERY_PARAM_BOOLS.get(value.strip().lower())
 
-        if normalized in {'0', 'false', 'no', 'off'}:
-            return False
+        if parsed is None:
+            raise ValueError(f"Invalid boolean value for '{name}'")
 
-        raise ValueError(f"Invalid boolean value for '{name}'")
+        return parsed
 
     @staticmethod
-    def _generate_etag(payload):
-        serialized = json.dumps(payload, sort_keys=True, separators=(',', ':'))
-        digest = hashlib.md5(serialized.encode('utf-8')).hexdigest()
+    def _generate_etag(body):
+        # ETags only need to tell representations apart; BLAKE2b is faster
+        # than MD5 for this and ships with hashlib.
+        digest = hashlib.blake2b(body, digest_size=16).hexdigest()
         return f'W/"{digest}"'
 
     def _matches_if_none_match(self, request, etag):
@@ -92,11 +145,84 @@ class AssetListViewV2(APIView):
         if not client_header:
             return False
 
-        for candidate in client_header.split(','):
-            if candidate.strip() == etag:
-                return True
+        # Clients almost always echo back the single ETag they were sent.
+        client_header = client_header.strip()
+        if client_header == etag:
+            return True
+
+        return any(
+            candidate.strip() == etag
+            for candidate in client_header.split(',')
+        )
+
+    @staticmethod
+    def _stream_assets(queryset):
+        renderer = ORJSONRenderer()
+        separator = b'['
+
+        for asset in queryset.iterator(chunk_size=500):
+            yield separator + renderer.render(AssetSerializerV2(asset).data)
+            separator = b','
+
+        yield b']' if separator == b',' else b'[]'
+
+    def _version_etag(self, request):
+        """Return an ETag that can be computed without loading any assets.
+
+        The list only changes when the database does, when an asset enters
+        or leaves its schedule (which changes the active asset IDs), or when
+        an upgrade changes how assets are serialized. Those plus the
+        request's representation and filters identify it. Returns ``None``
+        when the database exposes no version.
+        """
+        version = get_database_version()
+        if version is None:
+            return None
+
+        key = '|'.join((
+            diagnostics.get_git_hash() or '',
+            str(version),
+            request.accepted_media_type or '',
+            request.query_params.urlencode(),
+            ','.join(sorted(get_active_asset_ids())),
+        ))
+        return self._generate_etag(key.encode())
+
+    def _etag_response(self, request, payload, etag=None):
+        """Respond with ``payload`` and a weak ETag, or 304 if unchanged.
+
+        The JSON body is encoded once and used both for the ETag (unless one
+        is given) and, when JSON was negotiated, as the response content.
+        """
+        renderer = request.accepted_renderer
+        prerendered = isinstance(renderer, JSONRenderer)
+
+        if prerendered:
+            body = renderer.render(
+                payload,
+                request.accepted_media_type,
+                self.get_renderer_context(),
+            )
+        else:
+            body = ORJSONRenderer().render(payload)
+
+        if etag is None:
+            etag = self._generate_etag(body)
+
+        if self._matches_if_none_match(request, etag):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+            response['ETag'] = etag
+            return response
+
+        response = Response(payload)
 
-        return False
+        if prerendered:
+            # Marks the response as rendered while keeping ``data``.
+            response.content = body
+            response['Content-Type'] = renderer.media_type
+
+        response['ETag'] = etag
+        return response
 
     @extend_schema(
         summary='List assets',
@@ -106,32 +232,50 @@ class AssetListViewV2(APIView):
     )
     @authorized
     def get(self, request):
-        queryset = Asset.objects.all()
+        queryset = Asset.objects.only(*ASSET_LIST_FIELDS)
 
         try:
             is_enabled = self._parse_bool_query_param(
                 request.query_params.get('is_enabled'), 'is_enabled')
             is_active = self._parse_bool_query_param(
                 request.query_params.get('is_active'), 'is_active')
+            exact_count = self._parse_bool_query_param(
+                request.query_params.get('exact_count'), 'exact_count')
+            stream = self._parse_bool_query_param(
+                request.query_params.get('stream'), 'stream')
         except ValueError as error:
             return Response({'detail': str(error)},
                             status=status.HTTP_400_BAD_REQUEST)
 
-        search_term = request.query_params.get('search')
+        page = request.query_params.get('page')
+        page_size = request.query_params.get('page_size')
+
+        # Only an unpaginated JSON list is streamed; other representations
+        # are rendered as usual.
+        stream = bool(stream) and not (page or page_size) and isinstance(
+            request.accepted_renderer, JSONRenderer)
+
+        # Answer conditional requests before touching the assets table.
+        # Streamed responses carry no ETag, so they never answer 304.
+        etag = None if stream else self._version_etag(request)
+
+        if etag is not None and self._matches_if_none_match(request, etag):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+            response['ETag'] = etag
+            return response
+
+        # Surrounding whitespace (e.g. from a search box) is ignored, and a
+        # blank term skips the LIKE scans altogether.
+        search_term = (request.query_params.get('search') or '').strip()
 
         if is_enabled is not None:
             queryset = queryset.filter(is_enabled=is_enabled)
 
         if is_active is not None:
-            current_time = timezone.now()
-            active_filter = Q(is_enabled=True,
-                              start_date__lt=current_time,
-                              end_date__gt=current_time)
-
             if is_active:
-                queryset = queryset.filter(active_filter)
+                queryset = queryset.filter(ACTIVE_FILTER)
             else:
-                queryset = queryset.exclude(active_filter)
+                queryset = queryset.exclude(ACTIVE_FILTER)
 
         if search_term:
             queryset = queryset.filter(
@@ -140,9 +284,6 @@ class AssetListViewV2(APIView):
 
         queryset = queryset.order_by('play_order', 'asset_id')
 
-        page = request.query_params.get('page')
-        page_size = request.query_params.get('page_size')
-
         if page or page_size:
             try:
                 page_number = int(page) if page else 1
@@ -161,6 +302,20 @@ class AssetListViewV2(APIView):
 
             start = (page_number - 1) * page_limit
             end = start + page_limit
+
+            if exact_count is False:
+                # Fetch one extra row to tell whether another page exists,
+                # instead of running a separate COUNT query.
+                rows = list(queryset[start:end + 1])
+                serializer = AssetSerializerV2(rows[:page_limit], many=True)
+                response_payload = {
+                    'has_more': len(rows) > page_limit,
+                    'page': page_number,
+                    'page_size': page_limit,
+                    'results': serializer.data,
+                }
+                return self._etag_response(request, response_payload, etag)
+
             total_count = queryset.count()
             paginated_queryset = queryset[start:end]
             serializer = AssetSerializerV2(paginated_queryset, many=True)
@@ -171,28 +326,49 @@ class AssetListViewV2(APIView):
                 'results': serializer.data,
             }
 
-            etag = self._generate_etag(response_payload)
+            return self._etag_response(request, response_payload, etag)
 
-            if self._matches_if_none_match(request, etag):
-                response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        if stream:
+            # Large playlists are encoded row by row instead of being held
+            # in memory; streamed responses carry no ETag.
+            return StreamingHttpResponse(
+                self._stream_assets(queryset),
+                content_type=request.accepted_renderer.media_type,
+            )
+
+        cache_key = None
+        if etag is not None and isinstance(
+            request.accepted_renderer, JSONRenderer
+        ):
+            cache_key = ASSET_LIST_CACHE_KEY_PREFIX + etag
+
+            # The cache lives in Redis; without it the list is just
+            # rendered from the database.
+            try:
+                body = cache.get(cache_key)
+            except RedisError:
+                body = cache_key = None
+
+            if body is not None:
+                response = HttpResponse(
+                    body, content_type=request.accepted_renderer.media_type)
                 response['ETag'] = etag
                 return response
 
-            response = Response(response_payload)
-            response['ETag'] = etag
-            return response
-
         serializer = AssetSerializerV2(queryset, many=True)
-        response_payload = serializer.data
-        etag = self._generate_etag(response_payload)
+        response = self._etag_response(request, serializer.data, etag)
 
-        if self._matches_if_none_match(request, etag):
-            response = Response(status=status.HTTP_304_NOT_MODIFIED)
-            response['ETag'] = etag
-            return response
+        if (
+            cache_key is not None
+            and response.status_code == status.HTTP_200_OK
+            and len(response.content) <= ASSET_LIST_CACHE_MAX_SIZE
+        ):
+            try:
+                cache.set(
+                    cache_key, response.content, ASSET_LIST_CACHE_TIMEOUT)
+            except RedisError:
+                pass
 
-        response = Response(response_payload)
-        response['ETag'] = etag
         return response
 
     @extend_schema(
@@ -213,15 +389,20 @@ class AssetListViewV2(APIView):
         except AssetCreationError as error:
             return Response(error.errors, status=status.HTTP_400_BAD_REQUEST)
 
-        active_asset_ids = get_active_asset_ids()
-        asset = Asset.objects.create(**serializer.data)
-        asset.refresh_from_db()
+        # The new row and the reordering are committed together, so other
+        # requests never see the asset in the wrong position.
+        with transaction.atomic():
+            active_asset_ids = get_active_asset_ids()
+            asset = Asset.objects.create(**serializer.data)
+            asset.refresh_from_db()
 
-        if asset.is_active():
-            active_asset_ids.insert(asset.play_order, asset.asset_id)
+            if asset.is_active():
+                active_asset_ids.insert(asset.play_order, asset.asset_id)
+                # The only column the reordering writes is play_order,
+                # which becomes the asset's index in the list.
+                asset.play_order = active_asset_ids.index(asset.asset_id)
 
-        save_active_assets_ordering(active_asset_ids)
-        asset.refresh_from_db()
+            save_active_assets_ordering(active_asset_ids)
 
         return Response(
             AssetSerializerV2(asset).data,
@@ -236,7 +417,8 @@ class AssetViewV2(APIView, DeleteAssetViewMixin):
     @authorized
     def get(self, request, asset_id):
         try:
-            asset = Asset.objects.get(asset_id=asset_id)
+            asset = Asset.objects.only(*ASSET_LIST_FIELDS).get(
+                asset_id=asset_id)
         except Asset.DoesNotExist:
             return Response(status=status.HTTP_404_NOT_FOUND)
 
@@ -244,34 +426,40 @@ class AssetViewV2(APIView, DeleteAssetViewMixin):
         return Response(serializer.data)
 
     def update(self, request, asset_id, partial=False):
+        # ``save()`` on a partially loaded instance writes only the loaded
+        # columns, so ``md5`` is neither read nor rewritten here.
         try:
-            asset = Asset.objects.get(asset_id=asset_id)
+            asset = Asset.objects.only(*ASSET_LIST_FIELDS).get(
+                asset_id=asset_id)
         except Asset.DoesNotExist:
             return Response(status=status.HTTP_404_NOT_FOUND)
 
         serializer = UpdateAssetSerializerV2(
             asset, data=request.data, partial=partial)
 
-        if serializer.is_valid():
-            serializer.save()
-        else:
+        if not serializer.is_valid():
             return Response(
                 serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-        active_asset_ids = get_active_asset_ids()
+        with transaction.atomic():
+            # The serializer updates ``asset`` in place with the values it
+            # saved, so there is nothing to re-read.
+            serializer.save()
 
-        asset.refresh_from_db()
+            active_asset_ids = get_active_asset_ids()
 
-        try:
-            active_asset_ids.remove(asset.asset_id)
-        except ValueError:
-            pass
+            try:
+                active_asset_ids.remove(asset.asset_id)
+            except ValueError:
+                pass
 
-        if asset.is_active():
-            active_asset_ids.insert(asset.play_order, asset.asset_id)
+            if asset.is_active():
+                active_asset_ids.insert(asset.play_order, asset.asset_id)
+                # The only column the reordering writes is play_order,
+                # which becomes the asset's index in the list.
+                asset.play_order = active_asset_ids.index(asset.asset_id)
 
-        save_active_assets_ordering(active_asset_ids)
-        asset.refresh_from_db()
+            save_active_assets_ordering(active_asset_ids)
 
         return Response(AssetSerializerV2(asset).data)
 
@@ -330,6 +518,21 @@ class AssetsControlViewV2(AssetsControlViewMixin):
     pass
 
 
+# Settings copied verbatim from a PATCH payload. Authentication settings
+# and ``default_assets`` need extra handling and are applied separately.
+UPDATABLE_DEVICE_SETTINGS = (
+    'player_name',
+    'default_duration',
+    'default_streaming_duration',
+    'audio_output',
+    'date_format',
+    'show_splash',
+    'shuffle_playlist',
+    'use_24_hour_clock',
+    'debug_logging',
+)
+
+
 class DeviceSettingsViewV2(APIView):
     @extend_schema(
         summary='Get device settings',
@@ -370,9 +573,9 @@ class DeviceSettingsViewV2(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
-        filesystem_stats = statvfs("/")
-        total_storage = filesystem_stats.f_frsize * filesystem_stats.f_blocks
-        free_storage = filesystem_stats.f_frsize * filesystem_stats.f_bavail
+        disk_usage = get_disk_usage()
+        total_storage = disk_usage['total']
+        free_storage = disk_usage['free']
         used_storage = total_storage - free_storage
         percent_used = (
             round((used_storage / total_storage) * 100, 2)
@@ -525,32 +728,18 @@ class DeviceSettingsViewV2(APIView):
             settings['auth_backend'] = auth_backend
 
             # Update settings
-            if 'player_name' in data:
-                settings['player_name'] = data['player_name']
-            if 'default_duration' in data:
-                settings['default_duration'] = data['default_duration']
-            if 'default_streaming_duration' in data:
-                settings['default_streaming_duration'] = (
-                    data['default_streaming_duration']
-                )
-            if 'audio_output' in data:
-                settings['audio_output'] = data['audio_output']
-            if 'date_format' in data:
-                settings['date_format'] = data['date_format']
-            if 'show_splash' in data:
-                settings['show_splash'] = data['show_splash']
             if 'default_assets' in data:
                 if data['default_assets'] and not settings['default_assets']:
                     add_default_assets_task.delay()
                 elif not data['default_assets'] and settings['default_assets']:
                     remove_default_assets_task.delay()
                 settings['default_assets'] = data['default_assets']
-            if 'shuffle_playlist' in data:
-                settings['shuffle_playlist'] = data['shuffle_playlist']
-            if 'use_24_hour_clock' in data:
-                settings['use_24_hour_clock'] = data['use_24_hour_clock']
-            if 'debug_logging' in data:
-                settings['debug_logging'] = data['debug_logging']
+
+            settings.update({
+                key: data[key]
+                for key in UPDATABLE_DEVICE_SETTINGS
+                if key in data
+            })
 
             settings.save()
             publisher = ZmqPublisher.get_instance()
@@ -708,10 +897,17 @@ class InfoViewV2(InfoViewMixin):
     def get(self, request):
         viewlog = "Not yet implemented"
 
-        # Calculate disk space
-        slash = statvfs("/")
-        free_space = size(slash.f_bavail * slash.f_frsize)
-        display_power = r.get('display_power')
+        # Fetch everything this view needs from Redis in one round trip.
+        pipeline = r.pipeline(transaction=False)
+        pipeline.get('display_power')
+        pipeline.hgetall('disk_usage')
+
+        try:
+            display_power, disk_usage = pipeline.execute()
+        except RedisError:
+            display_power, disk_usage = None, {}
+
+        free_space = format_file_size(get_disk_usage(disk_usage)['free'])
 
         return Response({
             'viewlog': viewlog,
@@ -730,6 +926,21 @@ class InfoViewV2(InfoViewMixin):
         })
 
 
+# Set by the balena supervisor when the container starts, so the values
+# cannot change while the process is running.
+_BALENA_ENV = {
+    field: getenv(variable)
+    for field, variable in (
+        ('balena_device_id', 'BALENA_DEVICE_UUID'),
+        ('balena_app_id', 'BALENA_APP_ID'),
+        ('balena_app_name', 'BALENA_APP_NAME'),
+        ('balena_supervisor_version', 'BALENA_SUPERVISOR_VERSION'),
+        ('balena_host_os_version', 'BALENA_HOST_OS_VERSION'),
+        ('balena_device_name_at_init', 'BALENA_DEVICE_NAME_AT_INIT'),
+    )
+}
+
+
 class IntegrationsViewV2(APIView):
     serializer_class = IntegrationsSerializerV2
 
@@ -746,26 +957,27 @@ class IntegrationsViewV2(APIView):
         }
 
         if data['is_balena']:
-            data.update({
-                'balena_device_id': getenv('BALENA_DEVICE_UUID'),
-                'balena_app_id': getenv('BALENA_APP_ID'),
-                'balena_app_name': getenv('BALENA_APP_NAME'),
-                'balena_supervisor_version': (
-                    getenv('BALENA_SUPERVISOR_VERSION')
-                ),
-                'balena_host_os_version': (
-                    getenv('BALENA_HOST_OS_VERSION')
-                ),
-                'balena_device_name_at_init': (
-                    getenv('BALENA_DEVICE_NAME_AT_INIT')
-                ),
-            })
+            data.update(_BALENA_ENV)
 
         serializer = self.serializer_class(data=data)
         serializer.is_valid(raise_exception=True)
         return Response(serializer.data)
 
 
+# Seconds a health probe may take before its service is reported as down.
+HEALTH_CHECK_TIMEOUT = 2
+
+_health_check_pool = ThreadPoolExecutor(
+    max_workers=2, thread_name_prefix='health-check')
+
+
+def _health_check_result(future):
+    if not future.done():
+        return {'status': 'error', 'error': 'Health check timed out'}
+
+    return future.result()
+
+
 class HealthViewV2(APIView):
     authentication_classes = []
     permission_classes = []
@@ -796,8 +1008,18 @@ class HealthViewV2(APIView):
         }
     )
     def get(self, request):
-        redis_status = check_redis_health()
-        zmq_status = check_zmq_health()
+        # Both probes run concurrently, so the response takes as long as
+        # the slower one rather than their sum. The Redis probe carries its
+        # own socket timeout so that a hung server cannot keep a pool
+        # worker past the deadline; publishing on the ZMQ PUB socket never
+        # blocks.
+        redis_future = _health_check_pool.submit(
+            check_redis_health, timeout=HEALTH_CHECK_TIMEOUT)
+        zmq_future = _health_check_pool.submit(check_zmq_health)
+        wait((redis_future, zmq_future), timeout=HEALTH_CHECK_TIMEOUT)
+
+        redis_status = _health_check_result(redis_future)
+        zmq_status = _health_check_result(zmq_future)
 
         degraded = any(
             service.get('status') != 'ok'
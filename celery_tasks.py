@@ -47,6 +47,7 @@ def setup_periodic_tasks(sender, **kwargs):
     # Calls cleanup() every hour.
     sender.add_periodic_task(3600, cleanup.s(), name='cleanup')
     sender.add_periodic_task(60*5, get_display_power.s(), name='display_power')
+    sender.add_periodic_task(30, update_disk_usage.s(), name='disk_usage')
 
 
 @celery.task(time_limit=30)
@@ -55,6 +56,12 @@ def get_display_power():
     r.expire('display_power', 3600)
 
 
+@celery.task(time_limit=30)
+def update_disk_usage():
+    r.hset('disk_usage', mapping=diagnostics.get_disk_usage())
+    r.expire('disk_usage', 120)
+
+
 @celery.task
 def cleanup():
     sh.find(
@@ -3,17 +3,27 @@
 
 from __future__ import unicode_literals
 
+import binascii
 import hashlib
+import hmac
 import os.path
 from abc import ABCMeta, abstractmethod
 from base64 import b64decode
 from builtins import object, str
 from functools import wraps
+from threading import Lock
 
 from future.utils import with_metaclass
 
+# Django and DRF are imported where they are used: settings imports this
+# module, and the websocket server loads settings without either installed.
+
 LINUX_USER = os.getenv('USER', 'pi')
 
+# hashlib's OpenSSL-backed constructor, which picks the CPU's SHA-256
+# instructions (SHA-NI, ARMv8 SHA2) at runtime when they are available.
+_sha256 = hashlib.sha256
+
 
 def hash_password(password):
     """Return a SHA256 hex digest for a given password.
@@ -23,7 +33,78 @@ def hash_password(password):
     """
     if isinstance(password, str):
         password = password.encode('utf-8')
-    return hashlib.sha256(password).hexdigest()
+    return _sha256(password).hexdigest()
+
+
+def _secure_equals(a, b):
+    """Compare two strings in time independent of where they differ.
+
+    Anything that is not a string, such as a missing form field, is never
+    equal.
+    """
+    # Hex digests and most usernames are ASCII, which compare_digest()
+    # accepts as ``str`` directly; anything else has to be encoded first.
+    try:
+        return hmac.compare_digest(a, b)
+    except TypeError:
+        if not (isinstance(a, str) and isinstance(b, str)):
+            return False
+        return hmac.compare_digest(a.encode('utf-8'), b.encode('utf-8'))
+
+
+# Decoded credentials of Authorization headers that authenticated. Clients
+# resend the same header on every request; entries are keyed by a digest of
+# the header, so neither raw headers nor failed attempts stay in memory.
+BASIC_CREDENTIALS_CACHE_SIZE = 256
+
+_basic_credentials_cache = {}
+_basic_credentials_cache_lock = Lock()
+
+
+def _authorization_digest(authorization):
+    return hashlib.blake2b(
+        authorization.encode('utf-8'), digest_size=16).digest()
+
+
+def _remember_basic_credentials(key, credentials):
+    with _basic_credentials_cache_lock:
+        if len(_basic_credentials_cache) >= BASIC_CREDENTIALS_CACHE_SIZE:
+            del _basic_credentials_cache[next(iter(_basic_credentials_cache))]
+        _basic_credentials_cache[key] = credentials
+
+
+def _forget_basic_credentials(key):
+    with _basic_credentials_cache_lock:
+        _basic_credentials_cache.pop(key, None)
+
+
+def _basic_authorization_credentials(authorization):
+    """Return ``(username, password_hash)`` for a Basic Authorization header.
+
+    Returns ``None`` for headers of any other form.
+    """
+    content = authorization.split(' ')
+    if len(content) != 2 or content[0] != 'Basic':
+        return None
+
+    try:
+        auth_data = b64decode(content[1], validate=True)
+    except binascii.Error:
+        return None
+
+    # Split before decoding: only the username is needed as ``str``. The
+    # password is hashed as the bytes it arrived as, which are its UTF-8
+    # encoding for any password that can match.
+    username, separator, password = auth_data.partition(b':')
+    if not separator:
+        return None
+
+    try:
+        username = username.decode('utf-8')
+    except UnicodeDecodeError:
+        return None
+
+    return username, hash_password(password)
 
 
 class Auth(with_metaclass(ABCMeta, object)):
@@ -103,17 +184,23 @@ class NoAuth(Auth):
         return True
 
 
+def _hash_new_passwords(new_pass, new_pass2):
+    """Hash a new password and its confirmation, ``None`` for blank ones.
+
+    The confirmation usually matches, in which case it is hashed only once.
+    """
+    hashed_pass = hash_password(new_pass) if new_pass else None
+
+    if new_pass2 == new_pass:
+        return hashed_pass, hashed_pass
+
+    return hashed_pass, hash_password(new_pass2) if new_pass2 else None
+
+
 def update_basic_auth_credentials(settings, new_user, new_pass, new_pass2,
                                  current_pass_correct):
     """Update BasicAuth credentials shared across form and API handlers."""
-    hashed_pass = (
-        hashlib.sha256(new_pass.encode('utf-8')).hexdigest() if new_pass else None
-    )
-    hashed_pass2 = (
-        hashlib.sha256(new_pass2.encode('utf-8')).hexdigest()
-        if new_pass2
-        else None
-    )
+    hashed_pass, hashed_pass2 = _hash_new_passwords(new_pass, new_pass2)
 
     if settings['password']:  # if password currently set,
         if new_user != settings['user']:  # trying to change user
@@ -169,37 +256,59 @@ class BasicAuth(Auth):
         :param password: str
         :return: True if the check passes.
         """
-        return (
-            self.settings['user'] == username and self.check_password(password)
+        return self._check_and_hash(username, password)[0]
+
+    def _check_and_hash(self, username, password):
+        """
+        Like _check(), but also return the password hash it computed.
+        :return: (bool, str)
+        """
+        password_hash = hash_password(password)
+        # ``&`` rather than ``and`` so a wrong username takes as long to
+        # reject as a wrong password.
+        authenticated = (
+            _secure_equals(self.settings['user'], username) &
+            _secure_equals(self.settings['password'], password_hash)
         )
+        return authenticated, password_hash
 
     def check_password(self, password):
         hashed_password = hash_password(password)
-        return self.settings['password'] == hashed_password
+        return _secure_equals(self.settings['password'], hashed_password)
 
     def is_authenticated(self, request):
         # First check Authorization header for API requests
         authorization = request.headers.get('Authorization')
         if authorization:
-            content = authorization.split(' ')
-            if len(content) == 2:
-                auth_type = content[0]
-                auth_data = content[1]
-                if auth_type == 'Basic':
-                    auth_data = b64decode(auth_data).decode('utf-8')
-                    auth_data = auth_data.split(':')
-                    if len(auth_data) == 2:
-                        username = auth_data[0]
-                        password = auth_data[1]
-                        return self._check(username, password)
+            key = _authorization_digest(authorization)
+            credentials = _basic_credentials_cache.get(key)
+            cached = credentials is not None
+            if not cached:
+                credentials = _basic_authorization_credentials(authorization)
+
+            if credentials is not None:
+                username, password_hash = credentials
+                authenticated = (
+                    _secure_equals(self.settings['user'], username) &
+                    _secure_equals(self.settings['password'], password_hash)
+                )
+
+                # Credentials are compared against the current settings on
+                # every request; the cache only saves decoding and hashing.
+                if authenticated and not cached:
+                    _remember_basic_credentials(key, credentials)
+                elif cached and not authenticated:
+                    _forget_basic_credentials(key)
+
+                return authenticated
 
         # Then check session for form-based login
         username = request.session.get('auth_username')
         password_hash = request.session.get('auth_password_hash')
         if username and password_hash:
             return (
-                self.settings['user'] == username and
-                self.settings['password'] == password_hash
+                _secure_equals(self.settings['user'], username) &
+                _secure_equals(self.settings['password'], password_hash)
             )
 
         return False
@@ -214,56 +323,26 @@ class BasicAuth(Auth):
         return redirect(reverse('panelsh_app:login'))
 
     def update_settings(self, request, current_pass_correct):
-        new_user = request.POST.get('user', '')
-        new_pass = request.POST.get('password', '')
-        new_pass2 = request.POST.get('password2', '')
-        new_pass = hash_password(new_pass) if new_pass else None
-        new_pass2 = hash_password(new_pass2) if new_pass2 else None
-        if self.settings['password']:  # if password currently set,
-            if new_user != self.settings['user']:  # trying to change user
-                # Should have current password set.
-                # Optionally may change password.
-                if current_pass_correct is None:
-                    raise ValueError(
-                        "Must supply current password to change username")
-                if not current_pass_correct:
-                    raise ValueError("Incorrect current password.")
-
-                self.settings['user'] = new_user
-
-            if new_pass:
-                if current_pass_correct is None:
-                    raise ValueError(
-                        "Must supply current password to change password")
-                if not current_pass_correct:
-                    raise ValueError("Incorrect current password.")
-
-                if new_pass2 != new_pass:  # changing password
-                    raise ValueError("New passwords do not match!")
-
-                self.settings['password'] = new_pass
-
-        else:  # no current password
-            if new_user:  # setting username and password
-                if new_pass and new_pass != new_pass2:
-                    raise ValueError("New passwords do not match!")
-                if not new_pass:
-                    raise ValueError("Must provide password")
-                self.settings['user'] = new_user
-                self.settings['password'] = new_pass
-            else:
-                raise ValueError("Must provide username")
+        update_basic_auth_credentials(
+            self.settings,
+            request.POST.get('user', ''),
+            request.POST.get('password', ''),
+            request.POST.get('password2', ''),
+            current_pass_correct,
+        )
 
 
 def authorized(orig):
     from django.http import HttpRequest
     from rest_framework.request import Request
 
+    # Imported here because the settings module itself imports this one.
     from settings import settings
 
     @wraps(orig)
     def decorated(*args, **kwargs):
-        if not settings.auth:
+        auth = settings.auth
+        if not auth:
             return orig(*args, **kwargs)
 
         if len(args) == 0:
@@ -276,7 +355,7 @@ def authorized(orig):
                 'Request object is not of type HttpRequest or Request')
 
         return (
-            settings.auth.authenticate_if_needed(request) or
+            auth.authenticate_if_needed(request) or
             orig(*args, **kwargs)
         )
 
@@ -1,6 +1,8 @@
 from __future__ import unicode_literals
 
 import logging
+import re
+from functools import lru_cache
 
 logger = logging.getLogger(__name__)
 
@@ -10,52 +12,53 @@ def parse_cpu_info():
     Extracts the various Raspberry Pi related data
     from the CPU.
     """
+    # /proc/cpuinfo doesn't change while the process runs; hand out a copy
+    # of the cached result so callers can't alter it.
+    return dict(_read_cpu_info())
+
+
+# Only the lines parse_cpu_info() reports on. Lines without a value, such
+# as "Model\t:" on some kernels, don't match.
+_CPU_INFO_RE = re.compile(
+    r'^(processor|Serial|Hardware|Revision|Model)[ \t]*:[ \t]*(\S.*?)\s*$',
+    re.MULTILINE,
+)
+
+
+@lru_cache(maxsize=1)
+def _read_cpu_info():
     cpu_info = {
         'cpu_count': 0
     }
 
     with open('/proc/cpuinfo', 'r') as cpuinfo:
-        for line in cpuinfo:
-            stripped_line = line.strip()
-            if not stripped_line:
-                continue
-
-            if ':' not in line:
-                logger.warning('Malformed /proc/cpuinfo line missing separator: %s', line.rstrip())
-                continue
-
-            try:
-                key, value = [part.strip() for part in line.split(':', 1)]
-            except Exception:  # pragma: no cover - defensive logging
-                logger.exception('Failed to parse /proc/cpuinfo line: %s', line.rstrip())
-                continue
-
-            if not key or not value:
-                logger.warning('Malformed /proc/cpuinfo line missing key or value: %s', line.rstrip())
-                continue
-
-            if key == 'processor':
-                cpu_info['cpu_count'] += 1
-
-            if key in ['Serial', 'Hardware', 'Revision', 'Model']:
-                cpu_info[key.lower()] = value
+        content = cpuinfo.read()
+
+    for key, value in _CPU_INFO_RE.findall(content):
+        if key == 'processor':
+            cpu_info['cpu_count'] += 1
+        else:
+            cpu_info[key.lower()] = value
+
     return cpu_info
 
 
+# Board names as they appear in /proc/device-tree/model, e.g.
+# "Raspberry Pi 4 Model B Rev 1.1"; anything else is treated as a Pi 1.
+_DEVICE_MODEL_RE = re.compile(r'Raspberry Pi ([2-5])|Compute Module ([3-5])')
+
+
+# The board can't change while the process runs.
+@lru_cache(maxsize=1)
 def get_device_type():
     try:
         with open('/proc/device-tree/model') as file:
             content = file.read()
-
-            if 'Raspberry Pi 5' in content or 'Compute Module 5' in content:
-                return 'pi5'
-            elif 'Raspberry Pi 4' in content or 'Compute Module 4' in content:
-                return 'pi4'
-            elif 'Raspberry Pi 3' in content or 'Compute Module 3' in content:
-                return 'pi3'
-            elif 'Raspberry Pi 2' in content:
-                return 'pi2'
-            else:
-                return 'pi1'
     except FileNotFoundError:
         return 'x86'
+
+    match = _DEVICE_MODEL_RE.search(content)
+    if match is None:
+        return 'pi1'
+
+    return 'pi' + (match.group(1) or match.group(2))
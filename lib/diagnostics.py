@@ -5,6 +5,7 @@ from __future__ import absolute_import, unicode_literals
 import os
 from builtins import str
 from datetime import datetime
+from functools import lru_cache
 
 import cec
 
@@ -33,6 +34,18 @@ def get_display_power():
     return tv_status
 
 
+def get_disk_usage(path='/'):
+    """
+    Returns the total and free bytes of the filesystem containing path.
+    """
+    filesystem_stats = os.statvfs(path)
+
+    return {
+        'total': filesystem_stats.f_frsize * filesystem_stats.f_blocks,
+        'free': filesystem_stats.f_frsize * filesystem_stats.f_bavail,
+    }
+
+
 def get_uptime():
     with open('/proc/uptime', 'r') as f:
         uptime_seconds = float(f.readline().split()[0])
@@ -55,14 +68,17 @@ def get_load_avg():
     return load_avg
 
 
+@lru_cache(maxsize=1)
 def get_git_branch():
     return os.getenv('GIT_BRANCH')
 
 
+@lru_cache(maxsize=1)
 def get_git_short_hash():
     return os.getenv('GIT_SHORT_HASH')
 
 
+@lru_cache(maxsize=1)
 def get_git_hash():
     return os.getenv('GIT_HASH')
 
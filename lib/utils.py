@@ -11,6 +11,7 @@ import string
 from builtins import range, str
 from datetime import datetime, timedelta
 from distutils.util import strtobool
+from functools import lru_cache
 from os import getenv, path, utime
 from platform import machine
 from subprocess import call, check_output
@@ -87,9 +88,39 @@ def validate_url(string):
     )
 
 
-def check_redis_health(redis_client=None):
-    """Return structured Redis connectivity information."""
-    redis_client = redis_client or connect_to_redis()
+_FILE_SIZE_UNITS = (
+    (1 << 50, 'P'),
+    (1 << 40, 'T'),
+    (1 << 30, 'G'),
+    (1 << 20, 'M'),
+    (1 << 10, 'K'),
+)
+
+
+def format_file_size(num_bytes):
+    """Format a byte count with a binary unit suffix, rounding down.
+    >>> format_file_size(512)
+    '512B'
+    >>> format_file_size(1536)
+    '1K'
+    >>> format_file_size(20 * 1024 ** 3)
+    '20G'
+    """
+
+    for factor, suffix in _FILE_SIZE_UNITS:
+        if num_bytes >= factor:
+            return f'{num_bytes // factor}{suffix}'
+
+    return f'{num_bytes}B'
+
+
+def check_redis_health(redis_client=None, timeout=None):
+    """Return structured Redis connectivity information.
+
+    Without a client, a new connection is made whose connect and ping give
+    up after ``timeout`` seconds.
+    """
+    redis_client = redis_client or connect_to_redis(timeout=timeout)
 
     try:
         redis_client.ping()
@@ -334,20 +365,30 @@ def get_node_mac_address():
     Returns the MAC address.
     """
     if is_balena_app():
-        balena_supervisor_address = os.getenv('BALENA_SUPERVISOR_ADDRESS')
-        balena_supervisor_api_key = os.getenv('BALENA_SUPERVISOR_API_KEY')
-        headers = {'Content-Type': 'application/json'}
+        try:
+            return _get_balena_mac_address()
+        except LookupError:
+            return 'Unknown'
 
-        r = requests.get('{}/v1/device?apikey={}'.format(
-            balena_supervisor_address,
-            balena_supervisor_api_key
-        ), headers=headers)
+    return os.getenv('MAC_ADDRESS', 'Unable to retrieve MAC address.')
 
-        if r.ok:
-            return r.json()['mac_address']
-        return 'Unknown'
 
-    return os.getenv('MAC_ADDRESS', 'Unable to retrieve MAC address.')
+@lru_cache(maxsize=1)
+def _get_balena_mac_address():
+    # Failures raise instead of returning, so that they aren't cached and
+    # the next call asks the supervisor again.
+    balena_supervisor_address = os.getenv('BALENA_SUPERVISOR_ADDRESS')
+    balena_supervisor_api_key = os.getenv('BALENA_SUPERVISOR_API_KEY')
+    headers = {'Content-Type': 'application/json'}
+
+    r = requests.get('{}/v1/device?apikey={}'.format(
+        balena_supervisor_address,
+        balena_supervisor_api_key
+    ), headers=headers)
+
+    if not r.ok:
+        raise LookupError('Balena supervisor did not return a MAC address')
+    return r.json()['mac_address']
 
 
 def get_active_connections(bus, fields=None):
@@ -599,14 +640,22 @@ def generate_perfect_paper_password(pw_length=10, has_symbols=True):
         random.SystemRandom().choice(ppp_letters) for _ in range(pw_length))
 
 
-def connect_to_redis():
-    return redis.Redis(host='redis', decode_responses=True, port=6379, db=0)
+def connect_to_redis(timeout=None):
+    return redis.Redis(
+        host='redis',
+        decode_responses=True,
+        port=6379,
+        db=0,
+        socket_timeout=timeout,
+        socket_connect_timeout=timeout,
+    )
 
 
 def is_docker():
     return os.path.isfile('/.dockerenv')
 
 
+@lru_cache(maxsize=1)
 def is_balena_app():
     """
     Checks the application is running on Balena Cloud
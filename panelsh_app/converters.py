@@ -0,0 +1,16 @@
+class NonApiPathConverter:
+    """Match any path that is not under ``api/``.
+
+    A prefix check in ``to_python`` replaces a negative-lookahead regex;
+    raising ``ValueError`` makes the resolver move on to the next pattern.
+    """
+
+    regex = '.*'
+
+    def to_python(self, value):
+        if value.startswith('api/'):
+            raise ValueError('API paths are not handled by this pattern')
+        return value
+
+    def to_url(self, value):
+        return value
@@ -1,19 +1,86 @@
 import logging
 import uuid
 from os import getenv, path
+from threading import Lock, Thread
+from time import monotonic
+from types import MappingProxyType
 
 import yaml
 from django.shortcuts import render
 from django.utils import timezone
 
+from api.helpers import invalidate_active_asset_ids
 from lib.github import is_up_to_date
 from lib.utils import get_video_duration
 from settings import settings
 from panelsh_app.models import Asset
 
+# PyYAML only provides the libyaml-based loader when it was built against
+# libyaml; fall back to the pure-Python safe loader otherwise.
+try:
+    from yaml import CSafeLoader as YAMLSafeLoader
+except ImportError:
+    from yaml import SafeLoader as YAMLSafeLoader
+
 
 logger = logging.getLogger(__name__)
 
+# Seconds before a page render triggers a new update check.
+UP_TO_DATE_CACHE_TTL = 60
+
+# Until the first check completes the player is assumed to be up to date,
+# which is also what is_up_to_date() reports when it cannot tell.
+_up_to_date_cache = {'expires_at': None, 'value': True}
+
+# Held while a background check runs, so at most one is in flight.
+_up_to_date_refresh_lock = Lock()
+
+
+def _refresh_up_to_date():
+    try:
+        _up_to_date_cache['value'] = is_up_to_date()
+    finally:
+        _up_to_date_refresh_lock.release()
+
+
+def _cached_is_up_to_date():
+    """Return the last update check result without waiting for a new one.
+
+    is_up_to_date() shells out to git and may query GitHub and Docker Hub,
+    so once the result expires it is refreshed on a background thread and
+    renders keep using the previous value meanwhile.
+    """
+    now = monotonic()
+    expires_at = _up_to_date_cache['expires_at']
+
+    if (
+        (expires_at is None or now >= expires_at)
+        and _up_to_date_refresh_lock.acquire(blocking=False)
+    ):
+        _up_to_date_cache['expires_at'] = now + UP_TO_DATE_CACHE_TTL
+        Thread(
+            target=_refresh_up_to_date,
+            name='up-to-date-check',
+            daemon=True,
+        ).start()
+
+    return _up_to_date_cache['value']
+
+
+# Shared by every render; read-only all the way down, so nothing a view or
+# template does to it can leak into another request.
+_TEMPLATE_SETTINGS = MappingProxyType({
+    'imports': ('from lib.utils import template_handle_unicode',),
+    'default_filters': ('template_handle_unicode',),
+})
+
+_TEMPLATE_SETTINGS_KEYS = (
+    'date_format',
+    'default_duration',
+    'default_streaming_duration',
+    'use_24_hour_clock',
+)
+
 
 def template(request, template_name, context):
     """
@@ -22,17 +89,11 @@ def template(request, template_name, context):
     repeat code in other views.
     """
 
-    context['date_format'] = settings['date_format']
-    context['default_duration'] = settings['default_duration']
-    context['default_streaming_duration'] = (
-        settings['default_streaming_duration']
+    context['template_settings'] = _TEMPLATE_SETTINGS
+    context.update(
+        (key, settings[key]) for key in _TEMPLATE_SETTINGS_KEYS
     )
-    context['template_settings'] = {
-        'imports': ['from lib.utils import template_handle_unicode'],
-        'default_filters': ['template_handle_unicode'],
-    }
-    context['up_to_date'] = is_up_to_date()
-    context['use_24_hour_clock'] = settings['use_24_hour_clock']
+    context['up_to_date'] = _cached_is_up_to_date()
 
     return render(request, template_name, context)
 
@@ -81,7 +142,9 @@ def add_default_assets():
 
     with open(default_assets_yaml, 'r') as yaml_file:
         try:
-            default_assets = (yaml.safe_load(yaml_file) or {}).get('assets', [])
+            default_assets = (
+                yaml.load(yaml_file, Loader=YAMLSafeLoader) or {}
+            ).get('assets', [])
         except yaml.YAMLError as exc:
             logger.error("Failed to parse default assets YAML: %s", exc)
             return
@@ -94,6 +157,7 @@ def add_default_assets():
             return
 
         required_fields = ['name', 'uri', 'mimetype']
+        assets = []
 
         for default_asset in default_assets:
             if not isinstance(default_asset, dict):
@@ -119,17 +183,21 @@ def add_default_assets():
             asset = prepare_default_asset(**default_asset_settings)
 
             if asset:
-                Asset.objects.create(**asset)
+                assets.append(Asset(**asset))
             else:
                 logger.error(
                     "Default asset failed validation or had unsupported mimetype: %s",
                     default_asset,
                 )
 
+    # One INSERT for all default assets. bulk_create() sends no post_save
+    # signals, so the cached active asset IDs are dropped explicitly.
+    if assets:
+        Asset.objects.bulk_create(assets)
+        invalidate_active_asset_ids()
+
 
 def remove_default_assets():
     settings.load()
 
-    for asset in Asset.objects.all():
-        if asset.asset_id.startswith('default_'):
-            asset.delete()
+    Asset.objects.filter(asset_id__startswith='default_').delete()
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.25 on 2026-10-15 04:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('panelsh_app', '0002_auto_20241015_1524'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='asset',
+            index=models.Index(fields=['is_enabled', 'start_date', 'end_date'], name='assets_is_enab_4d1713_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.25 on 2026-10-15 05:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('panelsh_app', '0003_asset_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='asset',
+            index=models.Index(fields=['play_order', 'asset_id'], name='assets_play_or_c99c86_idx'),
+        ),
+    ]
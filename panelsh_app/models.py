@@ -26,6 +26,10 @@ class Asset(models.Model):
 
     class Meta:
         db_table = 'assets'
+        indexes = [
+            models.Index(fields=['is_enabled', 'start_date', 'end_date']),
+            models.Index(fields=['play_order', 'asset_id']),
+        ]
 
     def __str__(self):
         return self.name
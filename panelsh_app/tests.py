@@ -1,11 +1,37 @@
+import os
+import tempfile
+from threading import Lock
+
+from django.http import HttpResponse
 from django.test import Client, TestCase
-from django.urls import reverse
-from unittest.mock import patch
+from django.urls import Resolver404, resolve, reverse
+from unittest.mock import Mock, patch
+
+from lib.auth import BasicAuth, hash_password
+from panelsh_app.helpers import (
+    UP_TO_DATE_CACHE_TTL,
+    _cached_is_up_to_date,
+    add_default_assets,
+    remove_default_assets,
+    template,
+)
+from panelsh_app.models import Asset
+from panelsh_app.views import (
+    LOCKOUT_WINDOW_SECONDS,
+    MAX_LOGIN_ATTEMPTS,
+    NETWORK_METADATA_CACHE_TTL,
+)
 
 
 class SplashPageMetadataViewTest(TestCase):
     def setUp(self):
         self.client = Client()
+        cache_patcher = patch.dict(
+            'panelsh_app.views._network_metadata_cache',
+            {'expires_at': None, 'value': None},
+        )
+        cache_patcher.start()
+        self.addCleanup(cache_patcher.stop)
 
     @patch('panelsh_app.views.get_node_network_metadata')
     def test_returns_hostname_and_ip_addresses(self, get_node_network_metadata_mock):
@@ -21,3 +47,247 @@ class SplashPageMetadataViewTest(TestCase):
             response.json(),
             get_node_network_metadata_mock.return_value,
         )
+
+    @patch('panelsh_app.views.monotonic')
+    @patch('panelsh_app.views.get_node_network_metadata')
+    def test_metadata_is_reused_until_it_expires(
+        self, get_node_network_metadata_mock, monotonic_mock
+    ):
+        get_node_network_metadata_mock.return_value = {
+            'hostname': 'panel-host',
+            'ip_addresses': ['http://127.0.0.1'],
+        }
+        url = reverse('panelsh_app:splash_page_metadata')
+
+        monotonic_mock.return_value = 100
+        self.client.get(url)
+        monotonic_mock.return_value = 100 + NETWORK_METADATA_CACHE_TTL - 1
+        self.client.get(url)
+        self.assertEqual(get_node_network_metadata_mock.call_count, 1)
+
+        monotonic_mock.return_value = 100 + NETWORK_METADATA_CACHE_TTL
+        self.client.get(url)
+        self.assertEqual(get_node_network_metadata_mock.call_count, 2)
+
+
+class CachedIsUpToDateTest(TestCase):
+    def setUp(self):
+        cache_patcher = patch.dict(
+            'panelsh_app.helpers._up_to_date_cache',
+            {'expires_at': None, 'value': True},
+        )
+        cache_patcher.start()
+        self.addCleanup(cache_patcher.stop)
+
+        lock_patcher = patch(
+            'panelsh_app.helpers._up_to_date_refresh_lock', Lock()
+        )
+        lock_patcher.start()
+        self.addCleanup(lock_patcher.stop)
+
+    @patch('panelsh_app.helpers.Thread')
+    @patch('panelsh_app.helpers.monotonic')
+    @patch('panelsh_app.helpers.is_up_to_date')
+    def test_result_is_reused_until_it_expires(
+        self, is_up_to_date_mock, monotonic_mock, thread_mock
+    ):
+        # Run the background check as soon as it is started.
+        thread_mock.side_effect = lambda target, **kwargs: Mock(start=target)
+        is_up_to_date_mock.side_effect = [True, False]
+
+        monotonic_mock.return_value = 100
+        self.assertTrue(_cached_is_up_to_date())
+
+        monotonic_mock.return_value = 100 + UP_TO_DATE_CACHE_TTL - 1
+        self.assertTrue(_cached_is_up_to_date())
+        self.assertEqual(is_up_to_date_mock.call_count, 1)
+
+        monotonic_mock.return_value = 100 + UP_TO_DATE_CACHE_TTL
+        self.assertFalse(_cached_is_up_to_date())
+        self.assertEqual(is_up_to_date_mock.call_count, 2)
+
+    @patch('panelsh_app.helpers.Thread')
+    @patch('panelsh_app.helpers.monotonic')
+    def test_stale_result_is_served_while_check_runs(
+        self, monotonic_mock, thread_mock
+    ):
+        monotonic_mock.return_value = 100
+        self.assertTrue(_cached_is_up_to_date())
+
+        monotonic_mock.return_value = 100 + UP_TO_DATE_CACHE_TTL
+        self.assertTrue(_cached_is_up_to_date())
+
+        # The first check never finished, so no second one is started.
+        thread_mock.assert_called_once()
+        thread_mock.return_value.start.assert_called_once_with()
+
+
+class TemplateContextTest(TestCase):
+    @patch('panelsh_app.helpers._cached_is_up_to_date', return_value=True)
+    @patch('panelsh_app.helpers.settings')
+    @patch('panelsh_app.helpers.render')
+    def test_shared_template_settings_are_read_only(self, render_mock, *_):
+        template(None, 'react.html', {})
+        template_settings = render_mock.call_args[0][2]['template_settings']
+
+        with self.assertRaises(TypeError):
+            template_settings['imports'] = ()
+        with self.assertRaises(AttributeError):
+            template_settings['imports'].append('import os')
+
+        template(None, 'react.html', {})
+        self.assertEqual(
+            render_mock.call_args[0][2]['template_settings']['imports'],
+            ('from lib.utils import template_handle_unicode',),
+        )
+
+
+DEFAULT_ASSETS_YAML = '''
+assets:
+  - name: Welcome
+    uri: https://example.com/welcome.png
+    mimetype: image
+  - name: Dashboard
+    uri: https://example.com/
+    mimetype: webpage
+  - name: Missing URI
+    mimetype: image
+'''
+
+
+class AddDefaultAssetsTest(TestCase):
+    def setUp(self):
+        home = tempfile.TemporaryDirectory()
+        self.addCleanup(home.cleanup)
+        os.mkdir(os.path.join(home.name, '.panelsh'))
+        with open(
+            os.path.join(home.name, '.panelsh', 'default_assets.yml'), 'w'
+        ) as yaml_file:
+            yaml_file.write(DEFAULT_ASSETS_YAML)
+
+        home_patcher = patch.dict('os.environ', {'HOME': home.name})
+        home_patcher.start()
+        self.addCleanup(home_patcher.stop)
+
+    @patch('panelsh_app.helpers.invalidate_active_asset_ids')
+    @patch('panelsh_app.helpers.settings')
+    def test_valid_assets_are_inserted_in_one_query(
+        self, settings_mock, invalidate_mock
+    ):
+        settings_mock.__getitem__.side_effect = {'default_duration': 10}.get
+
+        with self.assertNumQueries(1):
+            add_default_assets()
+
+        self.assertEqual(
+            sorted(Asset.objects.values_list('name', flat=True)),
+            ['Dashboard', 'Welcome'],
+        )
+        self.assertTrue(
+            all(
+                asset_id.startswith('default_')
+                for asset_id in Asset.objects.values_list(
+                    'asset_id', flat=True
+                )
+            )
+        )
+        invalidate_mock.assert_called_once_with()
+
+
+class RemoveDefaultAssetsTest(TestCase):
+    @patch('panelsh_app.helpers.settings')
+    def test_only_default_assets_are_removed(self, _):
+        Asset.objects.create(asset_id='default_1', name='Default 1')
+        Asset.objects.create(asset_id='default_2', name='Default 2')
+        Asset.objects.create(asset_id='user_asset', name='User asset')
+
+        remove_default_assets()
+
+        self.assertEqual(
+            list(Asset.objects.values_list('asset_id', flat=True)),
+            ['user_asset'],
+        )
+
+
+@patch('panelsh_app.views.template', return_value=HttpResponse())
+@patch('panelsh_app.views.r')
+@patch('panelsh_app.views.settings')
+class LoginRateLimitTest(TestCase):
+    def setUp(self):
+        self.client = Client(REMOTE_ADDR='10.0.0.5')
+        self.url = reverse('panelsh_app:login')
+
+    @patch('panelsh_app.views._login_attempt_script', return_value=0)
+    def test_failed_login_is_recorded_in_one_call(
+        self, login_script_mock, settings_mock, redis_mock, template_mock
+    ):
+        settings_mock.auth._check_and_hash.return_value = (False, 'hash')
+
+        self.client.post(self.url, {'username': 'a', 'password': 'b'})
+
+        login_script_mock.assert_called_once_with(
+            keys=['login_attempts:10.0.0.5', 'login_blocked:10.0.0.5'],
+            args=['failure', LOCKOUT_WINDOW_SECONDS, MAX_LOGIN_ATTEMPTS],
+        )
+        redis_mock.get.assert_not_called()
+
+    @patch('panelsh_app.views._login_attempt_script', return_value=1)
+    def test_locked_out_client_is_refused_even_with_valid_credentials(
+        self, login_script_mock, settings_mock, redis_mock, template_mock
+    ):
+        settings_mock.auth._check_and_hash.return_value = (True, 'hash')
+
+        response = self.client.post(
+            self.url, {'username': 'a', 'password': 'b'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            login_script_mock.call_args.kwargs['args'][0], 'success')
+        self.assertNotIn('auth_username', self.client.session)
+
+    @patch('panelsh_app.views._login_attempt_script', return_value=0)
+    def test_successful_login_stores_checked_hash(
+        self, login_script_mock, settings_mock, redis_mock, template_mock
+    ):
+        settings_mock.auth._check_and_hash.return_value = (True, 'hash')
+
+        response = self.client.post(
+            self.url, {'username': 'a', 'password': 'b'})
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.client.session['auth_username'], 'a')
+        self.assertEqual(self.client.session['auth_password_hash'], 'hash')
+        settings_mock.auth._check_and_hash.assert_called_once_with('a', 'b')
+
+    @patch('panelsh_app.views._login_attempt_script', return_value=0)
+    def test_missing_fields_are_rejected(
+        self, login_script_mock, settings_mock, redis_mock, template_mock
+    ):
+        settings_mock.auth = BasicAuth({
+            'user': 'admin',
+            'password': hash_password('secret'),
+        })
+
+        for data in ({}, {'password': 'secret'}, {'username': 'admin'}):
+            with self.subTest(data=data):
+                response = self.client.post(self.url, data)
+
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(
+                    login_script_mock.call_args.kwargs['args'][0],
+                    'failure',
+                )
+                self.assertNotIn('auth_username', self.client.session)
+
+
+class ReactRouteTest(TestCase):
+    def test_non_api_paths_resolve_to_react(self):
+        for url in ('/', '/settings', '/assets/edit/1', '/apix'):
+            with self.subTest(url=url):
+                self.assertEqual(resolve(url).url_name, 'react')
+
+    def test_api_paths_are_not_caught(self):
+        self.assertEqual(resolve('/api/v2/assets').url_name, 'asset_list_v2')
+
+        with self.assertRaises(Resolver404):
+            resolve('/api/unknown')
@@ -1,6 +1,9 @@
-from django.urls import path, re_path
+from django.urls import path, register_converter
 
 from . import views
+from .converters import NonApiPathConverter
+
+register_converter(NonApiPathConverter, 'non_api')
 
 app_name = 'panelsh_app'
 
@@ -8,5 +11,6 @@ urlpatterns = [
     path('splash-page', views.splash_page, name='splash_page'),
     path('api/splash-page-metadata', views.splash_page_metadata, name='splash_page_metadata'),
     path('login/', views.login, name='login'),
-    re_path(r'^(?!api/).*$', views.react, name='react'),
+    path('', views.react, name='react'),
+    path('<non_api:path>', views.react, name='react'),
 ]
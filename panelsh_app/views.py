@@ -1,10 +1,12 @@
+from time import monotonic
+
 from django.contrib import messages
 from django.http import JsonResponse
 from django.shortcuts import redirect
 from django.urls import reverse
 from django.views.decorators.http import require_http_methods
 
-from lib.auth import authorized, hash_password
+from lib.auth import authorized
 from lib.utils import connect_to_redis, get_node_network_metadata
 from settings import settings
 
@@ -14,9 +16,38 @@ from .helpers import (
 
 r = connect_to_redis()
 
+# Seconds the node's hostname and IP addresses are reused. Looking them up
+# may round-trip through the host agent, and the splash page polls them.
+NETWORK_METADATA_CACHE_TTL = 5
+
+_network_metadata_cache = {'expires_at': None, 'value': None}
+
 MAX_LOGIN_ATTEMPTS = 5
 LOCKOUT_WINDOW_SECONDS = 300
 
+# Applies the outcome of a login attempt in one round trip. A blocked
+# client is reported as such and nothing changes. Otherwise a success
+# clears the counters, and a failure is counted, starting the lockout
+# window on the first one and blocking the client once the limit is hit.
+# KEYS: attempts, blocked. ARGV: outcome, window, max attempts.
+_login_attempt_script = r.register_script("""
+if redis.call('EXISTS', KEYS[2]) == 1 then
+    return 1
+end
+if ARGV[1] == 'success' then
+    redis.call('DEL', KEYS[1], KEYS[2])
+    return 0
+end
+local attempts = redis.call('INCR', KEYS[1])
+if attempts == 1 then
+    redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+if attempts >= tonumber(ARGV[3]) then
+    redis.call('SETEX', KEYS[2], ARGV[2], 1)
+end
+return 0
+""")
+
 
 def _client_ip(request):
     forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
@@ -25,39 +56,39 @@ def _client_ip(request):
     return request.META.get('REMOTE_ADDR', 'unknown')
 
 
-def _login_blocked(ip_address):
-    block_key = f"login_blocked:{ip_address}"
-    return bool(r and r.get(block_key))
-
-
-def _record_failed_login(ip_address):
+def _register_login_attempt(ip_address, succeeded):
+    """Record a login attempt; return True if the client is locked out."""
     attempts_key = f"login_attempts:{ip_address}"
     block_key = f"login_blocked:{ip_address}"
 
     if not r:
-        return
+        return False
 
-    attempts = r.incr(attempts_key)
-    if attempts == 1:
-        r.expire(attempts_key, LOCKOUT_WINDOW_SECONDS)
+    return bool(_login_attempt_script(
+        keys=[attempts_key, block_key],
+        args=[
+            'success' if succeeded else 'failure',
+            LOCKOUT_WINDOW_SECONDS,
+            MAX_LOGIN_ATTEMPTS,
+        ],
+    ))
 
-    if attempts >= MAX_LOGIN_ATTEMPTS:
-        r.setex(block_key, LOCKOUT_WINDOW_SECONDS, 1)
 
+def _cached_network_metadata():
+    now = monotonic()
+    expires_at = _network_metadata_cache['expires_at']
 
-def _reset_login_attempts(ip_address):
-    attempts_key = f"login_attempts:{ip_address}"
-    block_key = f"login_blocked:{ip_address}"
-
-    if not r:
-        return
+    if expires_at is None or now >= expires_at:
+        _network_metadata_cache['value'] = get_node_network_metadata()
+        _network_metadata_cache['expires_at'] = (
+            now + NETWORK_METADATA_CACHE_TTL
+        )
 
-    r.delete(attempts_key)
-    r.delete(block_key)
+    return _network_metadata_cache['value']
 
 
 @authorized
-def react(request):
+def react(request, path=''):
     return template(request, 'react.html', {})
 
 
@@ -65,26 +96,28 @@ def react(request):
 def login(request):
     if request.method == "POST":
         client_ip = _client_ip(request)
+        username = request.POST.get('username', '')
+        password = request.POST.get('password', '')
 
-        if _login_blocked(client_ip):
+        # The lockout check and the attempt bookkeeping are one Redis call,
+        # so the credentials are checked first; a locked-out client gets
+        # the same answer whether or not they were right.
+        authenticated, password_hash = settings.auth._check_and_hash(
+            username, password)
+
+        if _register_login_attempt(client_ip, authenticated):
             messages.error(request, 'Too many login attempts. Please try again later.')
             return template(request, 'login.html', {
                 'next': request.GET.get('next', '/')
             })
 
-        username = request.POST.get('username')
-        password = request.POST.get('password')
-
-        if settings.auth._check(username, password):
+        if authenticated:
             # Store only hashed credentials in session
             request.session['auth_username'] = username
-            request.session['auth_password_hash'] = hash_password(password)
-
-            _reset_login_attempts(client_ip)
+            request.session['auth_password_hash'] = password_hash
 
             return redirect(reverse('panelsh_app:react'))
         else:
-            _record_failed_login(client_ip)
             messages.error(request, 'Invalid username or password')
             return template(request, 'login.html', {
                 'next': request.GET.get('next', '/')
@@ -98,10 +131,10 @@ def login(request):
 @require_http_methods(["GET"])
 def splash_page(request):
     return template(request, 'splash-page.html', {
-        'ip_addresses': get_node_network_metadata()['ip_addresses']
+        'ip_addresses': _cached_network_metadata()['ip_addresses']
     })
 
 
 @require_http_methods(["GET"])
 def splash_page_metadata(request):
-    return JsonResponse(get_node_network_metadata())
+    return JsonResponse(_cached_network_metadata())
@@ -72,6 +72,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'api.middleware.APIGZipMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -116,6 +117,23 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# Redis is shared by all server workers, so invalidations triggered by model
+# signals in one worker are seen by the others. Tests run without a cache to
+# keep them independent of one another.
+CACHES = {
+    'default': (
+        {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}
+        if getenv('ENVIRONMENT') == 'test'
+        else {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': 'redis://redis:6379/1',
+        }
+    ),
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 AUTH_MODULE_PREFIX = 'django.contrib.auth.password_validation'
@@ -171,6 +189,10 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     'EXCEPTION_HANDLER': 'api.helpers.custom_exception_handler',
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
     # The project uses custom authentication classes,
     # so we need to disable the default ones.
     'DEFAULT_AUTHENTICATION_CLASSES': []
@@ -7,7 +7,7 @@ import json
 import logging
 from builtins import object, str
 from collections import UserDict
-from os import getenv, path
+from os import getenv, path, stat
 from time import sleep
 
 import zmq
@@ -76,6 +76,8 @@ class PanelshSettings(UserDict):
     """Panelsh' Settings."""
 
     def __init__(self, *args, **kwargs):
+        # Identifies the config-file contents currently held in memory.
+        self._loaded_signature = None
         UserDict.__init__(self, *args, **kwargs)
         self.home = getenv('HOME')
         self.conf_file = self.get_configfile()
@@ -93,6 +95,25 @@ class PanelshSettings(UserDict):
         else:
             self.load()
 
+    def __setitem__(self, key, value):
+        # In-memory changes make load() re-read the file even if it is
+        # unchanged, so that unsaved edits are still discarded.
+        self._loaded_signature = None
+        UserDict.__setitem__(self, key, value)
+
+    def _get_file_signature(self):
+        try:
+            file_stat = stat(self.conf_file)
+        except OSError:
+            return None
+
+        return (
+            self.conf_file,
+            file_stat.st_ino,
+            file_stat.st_size,
+            file_stat.st_mtime_ns,
+        )
+
     def _get(self, config, section, field, default):
         if field == 'analytics_opt_out':
             env_override = getenv('ANALYTICS_OPT_OUT')
@@ -135,7 +156,15 @@ class PanelshSettings(UserDict):
             config.set(section, field, str(self.get(field, default)))
 
     def load(self):
-        """Loads the latest settings from panelsh.conf into memory."""
+        """Loads the latest settings from panelsh.conf into memory.
+
+        Parsing is skipped when the file is unchanged since the last load
+        and nothing was modified in memory in the meantime.
+        """
+        signature = self._get_file_signature()
+        if signature is not None and signature == self._loaded_signature:
+            return
+
         logging.debug('Reading config-file...')
         config = configparser.ConfigParser()
         config.read(self.conf_file)
@@ -144,6 +173,8 @@ class PanelshSettings(UserDict):
             for field, default in list(defaults.items()):
                 self._get(config, section, field, default)
 
+        self._loaded_signature = signature
+
     def use_defaults(self):
         for defaults in list(DEFAULTS.items()):
             for field, default in list(defaults[1].items()):
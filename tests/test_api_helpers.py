@@ -47,3 +47,23 @@ class ParseRequestTestCase(unittest.TestCase):
             ValueError, "missing the required 'model' field"
         ):
             parse_request(request)
+
+    def test_raises_clear_error_when_model_is_not_json(self):
+        request = DummyRequest({"model": "not json"})
+
+        with self.assertRaisesRegex(
+            ValueError, "'model' field is not valid JSON"
+        ):
+            parse_request(request)
+
+    def test_raises_clear_error_for_non_json_data(self):
+        request = DummyRequest("not json")
+
+        with self.assertRaisesRegex(ValueError, "not valid JSON"):
+            parse_request(request)
+
+    def test_raises_clear_error_for_unsupported_data_type(self):
+        request = DummyRequest(["foo"])
+
+        with self.assertRaisesRegex(ValueError, "not valid JSON"):
+            parse_request(request)
@@ -1,7 +1,15 @@
 import hashlib
-from unittest import TestCase
+import os
+import subprocess
+import sys
+from base64 import b64encode
+from unittest import TestCase, mock
 
-from lib.auth import update_basic_auth_credentials
+from lib.auth import (
+    BasicAuth,
+    _basic_credentials_cache,
+    update_basic_auth_credentials,
+)
 
 
 class UpdateBasicAuthCredentialsTest(TestCase):
@@ -86,3 +94,167 @@ class UpdateBasicAuthCredentialsTest(TestCase):
             update_basic_auth_credentials(
                 self.settings, 'existing', 'new', 'different', True
             )
+
+    def test_basic_auth_update_settings_uses_same_validation(self):
+        auth = BasicAuth(self.settings)
+        request = mock.Mock(POST={
+            'user': 'new_user',
+            'password': 'pass',
+            'password2': 'pass',
+        })
+
+        auth.update_settings(request, None)
+
+        self.assertEqual(self.settings['user'], 'new_user')
+        self.assertEqual(
+            self.settings['password'],
+            hashlib.sha256(b'pass').hexdigest(),
+        )
+
+        request.POST['password2'] = 'other'
+        with self.assertRaisesRegex(ValueError, 'do not match'):
+            auth.update_settings(request, True)
+
+
+class BasicAuthIsAuthenticatedTest(TestCase):
+    def setUp(self):
+        self.settings = {
+            'user': 'admin',
+            'password': hashlib.sha256(b'secret').hexdigest(),
+        }
+        self.auth = BasicAuth(self.settings)
+
+        cache_patcher = mock.patch.dict(
+            'lib.auth._basic_credentials_cache', clear=True)
+        cache_patcher.start()
+        self.addCleanup(cache_patcher.stop)
+
+    def make_request(self, authorization=None, session=None):
+        headers = {}
+        if authorization is not None:
+            headers['Authorization'] = authorization
+        return mock.Mock(headers=headers, session=session or {})
+
+    def basic_header(self, username, password):
+        token = b64encode(f'{username}:{password}'.encode()).decode()
+        return f'Basic {token}'
+
+    def test_valid_basic_header(self):
+        request = self.make_request(self.basic_header('admin', 'secret'))
+
+        self.assertTrue(self.auth.is_authenticated(request))
+        self.assertTrue(self.auth.is_authenticated(request))
+
+    def test_wrong_password(self):
+        request = self.make_request(self.basic_header('admin', 'wrong'))
+
+        self.assertFalse(self.auth.is_authenticated(request))
+
+    def test_only_successful_headers_are_cached_by_digest(self):
+        valid = self.basic_header('admin', 'secret')
+        self.auth.is_authenticated(self.make_request(valid))
+        self.auth.is_authenticated(
+            self.make_request(self.basic_header('admin', 'wrong')))
+
+        self.assertEqual(list(_basic_credentials_cache.values()), [
+            ('admin', self.settings['password']),
+        ])
+        self.assertNotIn(valid, _basic_credentials_cache)
+
+        with mock.patch('lib.auth.b64decode') as b64decode_mock:
+            self.assertTrue(
+                self.auth.is_authenticated(self.make_request(valid)))
+        b64decode_mock.assert_not_called()
+
+    @mock.patch('lib.auth.BASIC_CREDENTIALS_CACHE_SIZE', 2)
+    def test_cache_size_is_bounded(self):
+        for password in ('one', 'two', 'three'):
+            self.settings['password'] = hashlib.sha256(
+                password.encode()).hexdigest()
+            self.auth.is_authenticated(
+                self.make_request(self.basic_header('admin', password)))
+
+        self.assertEqual(
+            [password_hash for _, password_hash in
+             _basic_credentials_cache.values()],
+            [
+                hashlib.sha256(b'two').hexdigest(),
+                hashlib.sha256(b'three').hexdigest(),
+            ],
+        )
+
+    def test_repeated_header_is_rejected_after_password_change(self):
+        request = self.make_request(self.basic_header('admin', 'secret'))
+        self.assertTrue(self.auth.is_authenticated(request))
+
+        self.settings['password'] = hashlib.sha256(b'changed').hexdigest()
+
+        self.assertFalse(self.auth.is_authenticated(request))
+        self.assertEqual(_basic_credentials_cache, {})
+
+    def test_other_schemes_fall_back_to_session(self):
+        request = self.make_request('Bearer token', session={
+            'auth_username': 'admin',
+            'auth_password_hash': self.settings['password'],
+        })
+
+        self.assertTrue(self.auth.is_authenticated(request))
+
+    def test_non_ascii_username(self):
+        self.settings['user'] = 'админ'
+        request = self.make_request(self.basic_header('админ', 'secret'))
+
+        self.assertTrue(self.auth.is_authenticated(request))
+        self.assertTrue(self.auth._check('админ', 'secret'))
+        self.assertFalse(self.auth._check('admin', 'secret'))
+
+    def test_password_may_contain_colons(self):
+        self.settings['password'] = hashlib.sha256(b'se:cr:et').hexdigest()
+        request = self.make_request(self.basic_header('admin', 'se:cr:et'))
+
+        self.assertTrue(self.auth.is_authenticated(request))
+
+    def test_malformed_basic_header_is_rejected(self):
+        for authorization in (
+            'Basic not-base64!',
+            'Basic ' + b64encode(b'no separator').decode(),
+            'Basic ' + b64encode(b'\xff:secret').decode(),
+        ):
+            with self.subTest(authorization=authorization):
+                request = self.make_request(authorization)
+                self.assertFalse(self.auth.is_authenticated(request))
+
+    def test_missing_username_is_rejected(self):
+        self.assertFalse(self.auth._check(None, 'secret'))
+        self.assertFalse(self.auth.is_authenticated(self.make_request(
+            session={
+                'auth_username': 1,
+                'auth_password_hash': self.settings['password'],
+            },
+        )))
+
+    def test_check_and_hash_returns_password_hash(self):
+        self.assertEqual(
+            self.auth._check_and_hash('admin', 'secret'),
+            (True, self.settings['password']),
+        )
+        self.assertEqual(
+            self.auth._check_and_hash('admin', 'wrong'),
+            (False, hashlib.sha256(b'wrong').hexdigest()),
+        )
+
+
+class ImportWithoutDjangoTest(TestCase):
+    def test_module_imports_without_django(self):
+        # The websocket image ships settings (and so this module) without
+        # Django or DRF.
+        subprocess.run(
+            [
+                sys.executable, '-c',
+                "import sys; "
+                "sys.modules.update(django=None, rest_framework=None); "
+                "import lib.auth",
+            ],
+            check=True,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        )
@@ -0,0 +1,77 @@
+import unittest
+from unittest import mock
+
+from lib import device_helper
+
+CPU_INFO = (
+    'processor\t: 0\n'
+    'BogoMIPS\t: 108.00\n'
+    'Features\t: fp asimd evtstrm crc32 cpuid\n'
+    '\n'
+    'processor\t: 1\n'
+    'BogoMIPS\t: 108.00\n'
+    '\n'
+    'Hardware\t: BCM2835\n'
+    'Revision\t: c03111\n'
+    'Serial\t\t: 10000000abcdef01\n'
+    'Model\t\t: Raspberry Pi 4 Model B Rev 1.1\n'
+)
+
+
+class ParseCpuInfoTest(unittest.TestCase):
+    def setUp(self):
+        device_helper._read_cpu_info.cache_clear()
+        self.addCleanup(device_helper._read_cpu_info.cache_clear)
+
+    def parse(self, content):
+        with mock.patch(
+            'builtins.open', mock.mock_open(read_data=content)
+        ):
+            return device_helper.parse_cpu_info()
+
+    def test_parse_cpu_info(self):
+        self.assertEqual(self.parse(CPU_INFO), {
+            'cpu_count': 2,
+            'hardware': 'BCM2835',
+            'revision': 'c03111',
+            'serial': '10000000abcdef01',
+            'model': 'Raspberry Pi 4 Model B Rev 1.1',
+        })
+
+    def test_lines_without_value_are_ignored(self):
+        self.assertEqual(
+            self.parse('processor\t: 0\nModel\t\t:\npower management:\n'),
+            {'cpu_count': 1},
+        )
+
+
+class GetDeviceTypeTest(unittest.TestCase):
+    def setUp(self):
+        device_helper.get_device_type.cache_clear()
+        self.addCleanup(device_helper.get_device_type.cache_clear)
+
+    def get_device_type(self, model):
+        with mock.patch(
+            'builtins.open', mock.mock_open(read_data=model)
+        ):
+            device_helper.get_device_type.cache_clear()
+            return device_helper.get_device_type()
+
+    def test_get_device_type(self):
+        for model, device_type in (
+            ('Raspberry Pi 5 Model B Rev 1.0\x00', 'pi5'),
+            ('Raspberry Pi Compute Module 5 Rev 1.0\x00', 'pi5'),
+            ('Raspberry Pi 4 Model B Rev 1.1\x00', 'pi4'),
+            ('Raspberry Pi Compute Module 4 Rev 1.0\x00', 'pi4'),
+            ('Raspberry Pi 3 Model B Plus Rev 1.3\x00', 'pi3'),
+            ('Raspberry Pi Compute Module 3 Rev 1.0\x00', 'pi3'),
+            ('Raspberry Pi 2 Model B Rev 1.1\x00', 'pi2'),
+            ('Raspberry Pi Model B Rev 2\x00', 'pi1'),
+            ('Raspberry Pi Zero W Rev 1.1\x00', 'pi1'),
+        ):
+            with self.subTest(model=model):
+                self.assertEqual(self.get_device_type(model), device_type)
+
+    @mock.patch('builtins.open', side_effect=FileNotFoundError)
+    def test_x86_without_device_tree(self, _):
+        self.assertEqual(device_helper.get_device_type(), 'x86')
@@ -4,7 +4,7 @@ import os
 import shutil
 import sys
 from contextlib import contextmanager
-from unittest import TestCase
+from unittest import TestCase, mock
 
 user_home_dir = os.getenv('HOME')
 
@@ -123,3 +123,27 @@ class SettingsTest(TestCase):
                 self.assertEqual(settings['verify_ssl'], True)
                 # no out of thin air changes?
                 self.assertEqual(settings['audio_output'], 'hdmi')
+
+    def test_load_skips_unchanged_file(self):
+        with fake_settings(settings1) as (mod_settings, settings):
+            with mock.patch.object(
+                mod_settings.configparser.ConfigParser, 'read'
+            ) as read_mock:
+                settings.load()
+
+            read_mock.assert_not_called()
+
+    def test_load_discards_unsaved_changes(self):
+        with fake_settings(settings1) as (mod_settings, settings):
+            settings['player_name'] = 'unsaved'
+            settings.load()
+
+            self.assertEqual(settings['player_name'], 'new player')
+
+    def test_load_picks_up_file_changes(self):
+        with fake_settings(settings1) as (mod_settings, settings):
+            with open(CONFIG_FILE, mode='w') as f:
+                f.write(settings1.replace('new player', 'other player'))
+            settings.load()
+
+            self.assertEqual(settings['player_name'], 'other player')
@@ -2,10 +2,17 @@
 
 import unittest
 from datetime import datetime
+from unittest import mock
 
 from django.test import TestCase
 
-from lib.utils import handler, template_handle_unicode, url_fails
+from lib import utils
+from lib.utils import (
+    format_file_size,
+    handler,
+    template_handle_unicode,
+    url_fails,
+)
 
 url_fail = 'http://doesnotwork.example.com'
 url_redir = 'http://example.com'
@@ -24,6 +31,51 @@ class UtilsTest(unittest.TestCase):
         json_str = handler(datetime(2016, 7, 19, 12, 42))
         self.assertEqual(json_str, '2016-07-19T12:42:00+00:00')
 
+    def test_format_file_size(self):
+        self.assertEqual(format_file_size(0), '0B')
+        self.assertEqual(format_file_size(1023), '1023B')
+        self.assertEqual(format_file_size(1024), '1K')
+        self.assertEqual(format_file_size((1 << 20) - 1), '1023K')
+        self.assertEqual(format_file_size(15 * (1 << 30) + 1), '15G')
+        self.assertEqual(format_file_size(3 << 50), '3P')
+
+    @mock.patch('lib.utils.redis.Redis')
+    def test_check_redis_health_bounds_connection_time(self, redis_mock):
+        self.assertEqual(
+            utils.check_redis_health(timeout=2), {'status': 'ok'})
+
+        _, kwargs = redis_mock.call_args
+        self.assertEqual(kwargs['socket_timeout'], 2)
+        self.assertEqual(kwargs['socket_connect_timeout'], 2)
+        redis_mock.return_value.ping.assert_called_once_with()
+
+
+class NodeMacAddressTest(unittest.TestCase):
+    def setUp(self):
+        utils._get_balena_mac_address.cache_clear()
+        self.addCleanup(utils._get_balena_mac_address.cache_clear)
+
+    @mock.patch('lib.utils.is_balena_app', return_value=True)
+    @mock.patch('lib.utils.requests.get')
+    def test_balena_mac_address_is_cached(self, get_mock, _):
+        get_mock.return_value.ok = True
+        get_mock.return_value.json.return_value = {
+            'mac_address': '00:11:22:33:44:55',
+        }
+
+        self.assertEqual(utils.get_node_mac_address(), '00:11:22:33:44:55')
+        self.assertEqual(utils.get_node_mac_address(), '00:11:22:33:44:55')
+        self.assertEqual(get_mock.call_count, 1)
+
+    @mock.patch('lib.utils.is_balena_app', return_value=True)
+    @mock.patch('lib.utils.requests.get')
+    def test_failed_balena_lookup_is_retried(self, get_mock, _):
+        get_mock.return_value.ok = False
+
+        self.assertEqual(utils.get_node_mac_address(), 'Unknown')
+        self.assertEqual(utils.get_node_mac_address(), 'Unknown')
+        self.assertEqual(get_mock.call_count, 2)
+
 
 class URLHelperTest(TestCase):
     def test_url_1(self):
@@ -7,6 +7,12 @@ from django.utils import timezone
 from panelsh_app.models import Asset
 from settings import settings
 
+PLAYLIST_FIELDS = [
+    field.attname
+    for field in Asset._meta.concrete_fields
+    if field.attname != 'md5'
+]
+
 
 def get_specific_asset(asset_id):
     logging.info('Getting specific asset')
@@ -24,7 +30,10 @@ def generate_asset_list():
         2. Get nearest deadline
     """
     logging.info('Generating asset-list...')
-    assets = Asset.objects.all()
+    # Only the columns ``is_active()`` reads are loaded for the deadlines.
+    assets = Asset.objects.only(
+        'is_enabled', 'start_date', 'end_date',
+    ).iterator(chunk_size=1000)
     deadlines = [
         asset.end_date
         if asset.is_active()
@@ -32,19 +41,17 @@ def generate_asset_list():
         for asset in assets
     ]
 
-    enabled_assets = Asset.objects.filter(
-        is_enabled=True,
-        start_date__isnull=False,
-        end_date__isnull=False,
-    ).order_by('play_order')
-    playlist = [
-        {
-            k: v for k, v in asset.__dict__.items()
-            if k not in ['_state', 'md5']
-        }
-        for asset in enabled_assets
-        if asset.is_active()
-    ]
+    # Same predicate as ``Asset.is_active()``, evaluated by the database;
+    # ``.values()`` yields the playlist dicts without building model
+    # instances.
+    current_time = timezone.now()
+    playlist = list(
+        Asset.objects.filter(
+            is_enabled=True,
+            start_date__lt=current_time,
+            end_date__gt=current_time,
+        ).order_by('play_order').values(*PLAYLIST_FIELDS)
+    )
 
     deadline = sorted(deadlines)[0] if len(deadlines) > 0 else None
     logging.debug('generate_asset_list deadline: %s', deadline)